@@ -3,91 +3,194 @@
 Autoscheduler2 - LLM-driven project management scheduling tool.
 
 This is the main entry point for the autoscheduler2 application.
-It initializes the CLI and starts the program.
+It starts the Docker services, then initializes the CLI and starts the program.
+Requires the package to be installed (`pip install -e .`); the installed
+`autoscheduler2` command runs the CLI without the Docker bootstrap.
 """
 
 import sys
-import subprocess
+import asyncio
+import functools
 import time
+from asyncio.subprocess import DEVNULL, PIPE
 from pathlib import Path
 
-# Add src directory to Python path
-src_path = Path(__file__).parent / "src" # __file__ contains path to current script, parent gets the directory containing __file__. We are appending the src folder to the path
-sys.path.insert(0, str(src_path)) # make sure python looks at src folder first when importing modules
+import orjson
 
-try:
-    from autoscheduler.cli import main as cli_main
-except ImportError as e:
-    print(f"Error importing CLI module: {e}")
-    print("Make sure you're running from the project root directory and have installed dependencies.")
-    sys.exit(1)
+from autoscheduler.cli import main as cli_main
+
+
+# Project root, where docker-compose.yml lives
+_HERE = Path(__file__).parent
+
+# Marker touched after a successful container check; a fresh marker skips probing
+DOCKER_OK_MARKER = Path.home() / ".cache" / "autoscheduler2" / "docker_ok"
+DOCKER_OK_TTL = 30  # seconds
+
+# Endpoints the Schedule connects to: Neo4j bolt and ChromaDB HTTP
+NEO4J_ADDRESS = ('localhost', 7687)
+CHROMADB_ADDRESS = ('localhost', 8000)
+# Same endpoint as the chromadb healthcheck in docker-compose.yml
+CHROMADB_HEARTBEAT_PATH = '/api/v1/heartbeat'
 
 
 def check_docker_containers():
     """Check if Docker containers are running and start them if needed."""
+    # Skip all subprocess probing if a recent launch already verified the containers
     try:
-        # Check if docker-compose is available
-        result = subprocess.run(['docker-compose', '--version'], 
-                              capture_output=True, text=True)
-        if result.returncode != 0:
-            print("Warning: docker-compose not found. Continuing without Docker services.")
-            return False
-            
-        # Check container status
-        print("Checking Docker containers...")
-        result = subprocess.run(['docker-compose', 'ps', '--services', '--filter', 'status=running'],
-                              capture_output=True, text=True, cwd=Path(__file__).parent)
-        
-        running_services = result.stdout.strip().split('\n') if result.stdout.strip() else []
-        required_services = ['neo4j', 'chromadb']
-        
-        # Check which services need to be started
-        services_to_start = [s for s in required_services if s not in running_services]
-        
-        if services_to_start:
-            print(f"Starting Docker services: {', '.join(services_to_start)}")
-            # Start the containers
-            result = subprocess.run(['docker-compose', 'up', '-d'] + services_to_start,
-                                  capture_output=True, text=True, cwd=Path(__file__).parent)
-            
-            if result.returncode != 0:
-                print(f"Warning: Failed to start Docker containers: {result.stderr}")
-                return False
-                
-            # Wait for services to be ready
-            print("Waiting for services to be ready...")
-            time.sleep(10)  # Initial wait for containers to start
-            max_wait = 60  # Maximum wait time
-            elapsed = 10
-            
-            while elapsed < max_wait:
-                time.sleep(5)
-                elapsed += 5
-                
-                # Check if Neo4j is ready by checking container health status
-                health_check = subprocess.run(
-                    ['docker', 'inspect', '--format', '{{.State.Health.Status}}', 'autoscheduler-neo4j'],
-                    capture_output=True, text=True
-                )
-                
-                if health_check.returncode == 0 and health_check.stdout.strip() == 'healthy':
-                    print("Services are ready!")
-                    return True
-                    
-                print(f"Still waiting for services... ({elapsed}s/{max_wait}s)")
-            
-            print("Warning: Services may not be fully ready, but continuing anyway.")
-            return True
-        else:
-            print("All required Docker services are already running.")
+        if time.time() - DOCKER_OK_MARKER.stat().st_mtime < DOCKER_OK_TTL:
             return True
-            
+    except OSError:
+        pass
+    
+    ok = _check_docker_containers(int(time.time() // DOCKER_OK_TTL))
+    if ok:
+        try:
+            DOCKER_OK_MARKER.parent.mkdir(parents=True, exist_ok=True)
+            DOCKER_OK_MARKER.touch()
+        except OSError:
+            pass
+    return ok
+
+
+@functools.lru_cache(maxsize=1)
+def _check_docker_containers(time_bucket):
+    """Probe and start Docker containers, memoized per DOCKER_OK_TTL time bucket.
+    
+    Args:
+        time_bucket (int): int(time.time() // DOCKER_OK_TTL); a new bucket invalidates the cache
+    """
+    try:
+        return asyncio.run(_check_async())
     except Exception as e:
         print(f"Warning: Error checking Docker containers: {e}")
         print("Continuing without Docker services.")
         return False
 
 
+async def _run(*args, cwd=None, stdout=PIPE, stderr=PIPE):
+    """Run a subprocess without blocking the event loop.
+    
+    Pass DEVNULL for streams whose output is not needed to skip capturing them.
+    
+    Returns:
+        tuple: (returncode, stdout, stderr) with captured output as bytes (None if not captured)
+    """
+    proc = await asyncio.create_subprocess_exec(*args, stdout=stdout, stderr=stderr, cwd=cwd)
+    stdout, stderr = await proc.communicate()
+    return proc.returncode, stdout, stderr
+
+
+async def _port_open(host, port):
+    """Return True if a TCP connection to host:port succeeds within 0.25s."""
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout=0.25)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    return True
+
+
+async def _chromadb_alive(host, port):
+    """Return True if ChromaDB answers its heartbeat endpoint.
+    
+    A bare TCP connect would accept any process listening on the port.
+    """
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout=0.25)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    try:
+        # HTTP/1.0: the server closes the connection after responding, so read() ends
+        writer.write(f"GET {CHROMADB_HEARTBEAT_PATH} HTTP/1.0\r\nHost: {host}\r\n\r\n".encode())
+        response = await asyncio.wait_for(reader.read(), timeout=1.0)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    finally:
+        writer.close()
+    
+    head, _, body = response.partition(b"\r\n\r\n")
+    if head.split(b" ", 2)[1:2] != [b"200"]:
+        return False
+    try:
+        return "nanosecond heartbeat" in orjson.loads(body)
+    except (orjson.JSONDecodeError, TypeError):
+        return False
+
+
+async def _services_ready():
+    """Return True if Neo4j accepts connections and ChromaDB answers its heartbeat."""
+    neo4j, chromadb = await asyncio.gather(_port_open(*NEO4J_ADDRESS), _chromadb_alive(*CHROMADB_ADDRESS))
+    return neo4j and chromadb
+
+
+async def _check_async():
+    """Check container status and start any missing services."""
+    # If the services already accept connections there is nothing to start
+    if await _services_ready():
+        print("All required Docker services are already running.")
+        return True
+    
+    # The version and status probes are independent, so issue them concurrently
+    print("Checking Docker containers...")
+    version, ps = await asyncio.gather(
+        _run('docker', 'compose', 'version', stdout=DEVNULL, stderr=DEVNULL),
+        _run('docker', 'compose', 'ps', '--format', 'json', cwd=_HERE, stderr=DEVNULL),
+    )
+    
+    if version[0] != 0:
+        print("Warning: docker compose not found. Continuing without Docker services.")
+        return False
+    
+    services = _parse_ps(ps[1])
+    required_services = ['neo4j', 'chromadb']
+    
+    # Anything not running and healthy goes to `up --wait`, which starts stopped
+    # services and blocks until starting ones pass their healthchecks
+    services_to_start = [s for s in required_services if not _is_ready(services.get(s))]
+    
+    if services_to_start:
+        print(f"Starting Docker services: {', '.join(services_to_start)}")
+        print("Waiting for services to be ready...")
+        returncode, _, stderr = await _run(
+            'docker', 'compose', 'up', '-d', '--wait', '--wait-timeout', '60', *services_to_start,
+            cwd=_HERE, stdout=DEVNULL
+        )
+        
+        if returncode != 0:
+            print(f"Warning: Failed to start Docker containers: {stderr.decode()}")
+            return False
+            
+        print("Services are ready!")
+        return True
+    else:
+        print("All required Docker services are already running.")
+        return True
+
+
+def _parse_ps(stdout):
+    """Parse `docker compose ps --format json` output.
+    
+    Older Compose releases print a JSON array, newer ones one object per line.
+    
+    Returns:
+        dict: Service name -> ps entry ({"Service": ..., "State": ..., "Health": ...})
+    """
+    stdout = stdout.strip()
+    if not stdout:
+        return {}
+    if stdout.startswith(b'['):
+        entries = orjson.loads(stdout)
+    else:
+        entries = [orjson.loads(line) for line in stdout.splitlines() if line.strip()]
+    return {entry['Service']: entry for entry in entries}
+
+
+def _is_ready(entry):
+    """Return True if a ps entry is running and healthy (or has no healthcheck)."""
+    return bool(entry) and entry.get('State') == 'running' and entry.get('Health', '') in ('', 'healthy')
+
+
 def main():
     """Main entry point for the autoscheduler2 application."""
     try:
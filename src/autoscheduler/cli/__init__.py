@@ -4,8 +4,14 @@ CLI module for autoscheduler2.
 Provides the command-line interface for the autoscheduler application.
 """
 
+try:
+    import readline  # noqa: F401  # line editing and history for input()
+except ImportError:
+    pass
+
 from ..core.scope_manager import ScopeManager
 from ..core.schedule import Schedule
+from ..logging_config import configure as configure_logging
 
 
 class CLI:
@@ -15,6 +21,16 @@ class CLI:
         """Initialize the CLI with ScopeManager and Schedule instances."""
         self.schedule = Schedule()
         self.scope_manager = ScopeManager(self.schedule)
+        
+        # Menu choice -> (label, handler) for the scope manager operations
+        self._actions = {
+            "1": ("Add Activity", self.scope_manager._add_activity),
+            "2": ("Delete Activity", self.scope_manager._delete_activity),
+            "3": ("Add Relationship", self.scope_manager._add_relationship),
+            "4": ("Delete Relationship", self.scope_manager._delete_relationship),
+            "5": ("Dissolve Activity", self.scope_manager._dissolve_activity),
+            "6": ("Open Prompt", self.scope_manager._dispatch),
+        }
     
     def run(self):
         """Main program loop that presents user with menu options."""
@@ -26,30 +42,11 @@ class CLI:
             self._display_menu()
             choice = input("\nEnter your choice (1-8): ").strip()
             
-            if choice == "1":
-                print("\n--- Add Activity ---")
-                success = self.scope_manager._add_activity()
-                self._show_result(success, "Activity operation")
-            elif choice == "2":
-                print("\n--- Delete Activity ---")
-                success = self.scope_manager._delete_activity()
-                self._show_result(success, "Delete activity operation")
-            elif choice == "3":
-                print("\n--- Add Relationship ---")
-                success = self.scope_manager._add_relationship()
-                self._show_result(success, "Add relationship operation")
-            elif choice == "4":
-                print("\n--- Delete Relationship ---")
-                success = self.scope_manager._delete_relationship()
-                self._show_result(success, "Delete relationship operation")
-            elif choice == "5":
-                print("\n--- Dissolve Relationship ---")
-                success = self.scope_manager._dissolve_relationship()
-                self._show_result(success, "Dissolve relationship operation")
-            elif choice == "6":
-                print("\n--- Open Prompt ---")
-                success = self.scope_manager._dispatch()
-                self._show_result(success, "Natural language prompt operation")
+            entry = self._actions.get(choice)
+            if entry:
+                label, handler = entry
+                print(f"\n--- {label} ---")
+                self._show_result(handler(), f"{label} operation")
             elif choice == "7":
                 print("\n--- Run Schedule ---")
                 print("Schedule execution not implemented yet.")
@@ -70,7 +67,7 @@ class CLI:
         print("2. Delete Activity")
         print("3. Add Relationship")
         print("4. Delete Relationship")
-        print("5. Dissolve Relationship")
+        print("5. Dissolve Activity")
         print("6. Open Prompt (Natural Language)")
         print("7. Run Schedule")
         print("8. Quit")
@@ -91,5 +88,6 @@ class CLI:
 
 def main():
     """Main entry point for the CLI application."""
+    configure_logging()
     cli = CLI()
     cli.run()
\ No newline at end of file
@@ -4,47 +4,225 @@ Schedule class for autoscheduler2.
 Contains the database and NetworkX representation of the schedule.
 """
 
+import asyncio
 import logging
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 from typing import Optional
 import networkx as nx
+import orjson
 from neo4j import GraphDatabase
 import chromadb
 from dotenv import load_dotenv
 
+from ..llm.embeddings import encode
+from ..llm.vector_index import VEC_INDEX_ENABLED, VectorIndex
+
 # Load environment variables
 load_dotenv()
 
+# Module logger; handlers are configured once at startup (see autoscheduler.logging_config)
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds a connectivity check result is reused before probing again
+CONNECTION_CHECK_TTL = 5.0
+
+# Cypher statements are module constants so every call sends an identical query
+# string (hitting Neo4j's plan cache); values are always passed as parameters.
+
+# Node ids are unique; the constraint's index also serves every MERGE/MATCH on Node.id
+_CYPHER_NODE_ID_CONSTRAINT = (
+    "CREATE CONSTRAINT node_id IF NOT EXISTS FOR (n:Node) REQUIRE n.id IS UNIQUE"
+)
+
+# An activity is a start node (s-<id>), an intra-activity node (<id>) carrying the
+# duration and an end node (e-<id>), chained by PRECEDES edges
+_CYPHER_ADD_ACTIVITY = (
+    "MERGE (s:Node {id: 's-' + $id}) SET s.activity_id = $id, s.duration = 0 "
+    "MERGE (a:Node {id: $id}) SET a.activity_id = $id, a.duration = $duration "
+    "MERGE (e:Node {id: 'e-' + $id}) SET e.activity_id = $id, e.duration = 0 "
+    "MERGE (s)-[:PRECEDES]->(a) "
+    "MERGE (a)-[:PRECEDES]->(e)"
+)
+
+# Relationship nodes attached to an activity's start or end node
+_CYPHER_ACTIVITY_RELATIONSHIPS = (
+    "UNWIND ['s-' + $id, 'e-' + $id] AS node_id "
+    "MATCH (:Node {id: node_id})-[:PRECEDES]-(r:Node) "
+    "WHERE r.relationship_id IS NOT NULL "
+    "RETURN DISTINCT r.relationship_id AS id"
+)
+
+# Removes an activity's three nodes and the given relationship nodes
+_CYPHER_REMOVE_ACTIVITY = (
+    "UNWIND ['s-' + $id, $id, 'e-' + $id] + $relationship_ids AS node_id "
+    "MATCH (n:Node {id: node_id}) "
+    "DETACH DELETE n "
+    "RETURN count(n) AS removed"
+)
+
+# A relationship is a node carrying the lag between a predecessor and successor endpoint
+_CYPHER_ADD_RELATIONSHIP = (
+    "MATCH (p:Node {id: $predecessor_node}), (q:Node {id: $successor_node}) "
+    "MERGE (r:Node {id: $id}) SET r.relationship_id = $id, r.duration = $lag "
+    "MERGE (p)-[:PRECEDES]->(r) "
+    "MERGE (r)-[:PRECEDES]->(q) "
+    "RETURN r.id AS id"
+)
+
+_CYPHER_REMOVE_RELATIONSHIP = (
+    "MATCH (r:Node {id: $id}) "
+    "DETACH DELETE r "
+    "RETURN count(r) AS removed"
+)
+
+# Relationship type -> (predecessor endpoint prefix, successor endpoint prefix)
+_RELATIONSHIP_ENDPOINTS = {
+    "FS": ("e-", "s-"),
+    "SS": ("s-", "s-"),
+    "FF": ("e-", "e-"),
+    "SF": ("s-", "e-"),
+}
+
+# Every PRECEDES edge in one query; the edge weight is the source node's duration
+# (activity duration for intra-activity nodes, lag for relationship nodes, 0 for s-/e- nodes)
+_CYPHER_GRAPH_EDGES = (
+    "MATCH (a:Node)-[:PRECEDES]->(b:Node) "
+    "RETURN a.id AS source, b.id AS target, coalesce(a.duration, 0) AS weight"
+)
+
+# Records pulled from a Neo4j result per fetch
+NEO4J_FETCH_SIZE = 1000
+
+# Number of results returned by each semantic search
+SEMANTIC_SEARCH_RESULTS = 10
+
+
+class _LocalEmbeddingFunction:
+    """ChromaDB embedding function backed by the shared local all-MiniLM-L6-v2 encoder."""
+    
+    def __call__(self, input):
+        return encode(input).tolist()
+
+
+@lru_cache(maxsize=256)
+def _embed(query: str) -> tuple:
+    """Embed a normalized query string, memoized so repeated prompts skip the model pass."""
+    return tuple(encode([query])[0].tolist())
+
+
+# Nested payload fields stored in ChromaDB metadata as JSON strings
+_JSON_METADATA_FIELDS = ("predecessor", "successor")
+
+
+def _encode_metadata(payload: dict) -> dict:
+    """Convert a payload to ChromaDB metadata.
+    
+    ChromaDB metadata values must be scalars, so nested values are serialized
+    with orjson and None values are dropped.
+    """
+    metadata = {}
+    for key, value in payload.items():
+        if value is None:
+            continue
+        if isinstance(value, (str, int, float, bool)):
+            metadata[key] = value
+        else:
+            metadata[key] = orjson.dumps(value, default=str).decode()
+    return metadata
+
+
+def _activity_summary(activity) -> dict:
+    """Fields of an ActivitySchema stored in the embeddings database."""
+    return {
+        "activity_id": str(activity.activity_id),
+        "name": activity.name,
+        "description": activity.description,
+        "duration": activity.duration,
+    }
+
+
+def _activity_document(activity) -> str:
+    """Text embedded for an activity (name, description and duration)."""
+    return f"{activity.name}\n{activity.description}\nDuration: {activity.duration}"
+
+
+def _relationship_type(relationship) -> str:
+    """Relationship type as a plain string (accepts RelationshipType or str)."""
+    return getattr(relationship.type, "value", relationship.type)
+
+
+def _relationship_document(relationship) -> str:
+    """Text embedded for an inter-activity relationship."""
+    predecessor, successor = relationship.predecessor, relationship.successor
+    return (
+        f"{_relationship_type(relationship)} relationship with lag {relationship.lag}\n"
+        f"Predecessor: {_activity_document(predecessor)}\n"
+        f"Successor: {_activity_document(successor)}"
+    )
+
+
+def _decode_metadata(metadata: dict) -> dict:
+    """Inverse of _encode_metadata for the fields in _JSON_METADATA_FIELDS."""
+    payload = dict(metadata)
+    for key in _JSON_METADATA_FIELDS:
+        if isinstance(payload.get(key), str):
+            payload[key] = orjson.loads(payload[key])
+    return payload
+
 
 class Schedule:
     """Contains the database and NetworkX representation of the schedule."""
     
     def __init__(self):
         """Initialize Schedule with Neo4j database, NetworkX graph, and embeddings."""
-        # Set up logging
-        self.logger = logging.getLogger('autoscheduler.core.schedule')
-        self.logger.setLevel(logging.INFO)
+        self.logger = _LOGGER
+        self.logger.info("Starting Schedule initialization...")
         
-        # Create console handler if no handlers exist
-        if not self.logger.handlers:
-            handler = logging.StreamHandler()
-            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-            handler.setFormatter(formatter)
-            self.logger.addHandler(handler)
+        # Cached connectivity check results (see is_neo4j_connected / is_chromadb_connected)
+        self._neo4j_ok = False
+        self._neo4j_ok_ts = float('-inf')
+        self._chromadb_ok = False
+        self._chromadb_ok_ts = float('-inf')
         
-        self.logger.info("Starting Schedule initialization...")
+        # Set once the Node.id uniqueness constraint is known to exist (see _run_cypher)
+        self._neo4j_schema_ready = False
         
-        # Initialize databases
-        self.neo4j_db = self._initialize_neo4j()
-        self.chroma_client = self._initialize_chromadb()
+        # ChromaDB server URL or data path, set by _initialize_chromadb
+        self.chroma_location = None
+        
+        # Initialize databases (independent network I/O, so overlap them)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            neo4j_future = executor.submit(self._initialize_neo4j)
+            chroma_future = executor.submit(self._initialize_chromadb)
+            self.neo4j_db = neo4j_future.result()
+            self.chroma_client = chroma_future.result()
         
         # NetworkX DiGraph for critical path calculations
         self.graph = nx.DiGraph()
         self.logger.info("NetworkX DiGraph initialized for critical path calculations")
         
-        # Vector embeddings collections
-        self.activities_embeddings = self._get_or_create_collection("activities")
-        self.relationships_embeddings = self._get_or_create_collection("relationships")
+        # Vector embeddings collections, memoized by name (see _get_or_create_collection)
+        self._coll_cache = {}
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            activities_future = executor.submit(self._get_or_create_collection, "activities")
+            relationships_future = executor.submit(self._get_or_create_collection, "relationships")
+            self.activities_embeddings = activities_future.result()
+            self.relationships_embeddings = relationships_future.result()
+        
+        # sqlite-vec mirror of the activities collection used for scope retrieval, one
+        # database file per ChromaDB collection (None when MEMOS_USE_VEC_INDEX=false,
+        # sqlite-vec is unavailable or there is no collection to mirror; searches then
+        # go through ChromaDB)
+        self.vector_index = None
+        self._index_stale = False
+        if VEC_INDEX_ENABLED and self.activities_embeddings is not None:
+            index = VectorIndex(source=f"{self.chroma_location}/{self.activities_embeddings.name}")
+            if index.available:
+                self.vector_index = index
+                self._sync_vector_index()
         
         self.logger.info("Schedule initialization completed successfully")
     
@@ -55,16 +233,12 @@ class Schedule:
             username = os.getenv('NEO4J_USERNAME', 'neo4j')
             password = os.getenv('NEO4J_PASSWORD', 'password')
             
-            self.logger.info(f"Attempting to connect to Neo4j at {uri}")
+            self.logger.info(f"Creating Neo4j driver for {uri}")
+            # The driver connects lazily on first use; connectivity is verified
+            # on demand by is_neo4j_connected rather than on every startup
             driver = GraphDatabase.driver(uri, auth=(username, password))
-            
-            # Test connection
-            with driver.session() as session:
-                result = session.run("RETURN 1 as test")
-                test_value = result.single()["test"]
-                if test_value == 1:
-                    self.logger.info("Neo4j connection established successfully")
-                    return driver
+            self.logger.info("Neo4j driver created")
+            return driver
                     
         except Exception as e:
             self.logger.warning(f"Failed to connect to Neo4j: {e}")
@@ -90,6 +264,7 @@ class Schedule:
                 # Test connection
                 client.heartbeat()
                 self.logger.info("ChromaDB server connection established successfully")
+                self.chroma_location = f"http://{chroma_host}:{chroma_port}"
                 return client
             except Exception as server_error:
                 self.logger.info(f"ChromaDB server not available: {server_error}")
@@ -99,6 +274,7 @@ class Schedule:
             data_path = os.getenv('CHROMADB_DATA_PATH', './chroma_data')
             client = chromadb.PersistentClient(path=data_path)
             self.logger.info(f"ChromaDB persistent client initialized at {data_path}")
+            self.chroma_location = os.path.abspath(data_path)
             return client
             
         except Exception as e:
@@ -108,16 +284,22 @@ class Schedule:
         return None
     
     def _get_or_create_collection(self, collection_name: str):
-        """Get or create a ChromaDB collection."""
+        """Get or create a ChromaDB collection, cached for the lifetime of the Schedule."""
         if not self.chroma_client:
             self.logger.debug(f"ChromaDB not available, skipping collection creation for {collection_name}")
             return None
+        
+        collection = self._coll_cache.get(collection_name)
+        if collection is not None:
+            return collection
             
         try:
             collection = self.chroma_client.get_or_create_collection(
                 name=f"autoscheduler_{collection_name}",
-                metadata={"description": f"Autoscheduler {collection_name} embeddings"}
+                metadata={"description": f"Autoscheduler {collection_name} embeddings"},
+                embedding_function=_LocalEmbeddingFunction()
             )
+            self._coll_cache[collection_name] = collection
             self.logger.info(f"ChromaDB collection '{collection_name}' ready")
             return collection
         except Exception as e:
@@ -126,28 +308,169 @@ class Schedule:
     
     @property
     def is_neo4j_connected(self) -> bool:
-        """Check if Neo4j is connected and available."""
+        """Check if Neo4j is connected and available (cached for CONNECTION_CHECK_TTL seconds)."""
         if not self.neo4j_db:
             return False
+        now = time.monotonic()
+        if now - self._neo4j_ok_ts < CONNECTION_CHECK_TTL:
+            return self._neo4j_ok
         try:
-            with self.neo4j_db.session() as session:
-                session.run("RETURN 1").single()
-            return True
+            self.neo4j_db.verify_connectivity()
+            self._neo4j_ok = True
         except Exception:
-            return False
+            self._neo4j_ok = False
+        self._neo4j_ok_ts = now
+        return self._neo4j_ok
     
     @property
     def is_chromadb_connected(self) -> bool:
-        """Check if ChromaDB is connected and available."""
+        """Check if ChromaDB is connected and available (cached for CONNECTION_CHECK_TTL seconds)."""
         if not self.chroma_client:
             return False
+        now = time.monotonic()
+        if now - self._chromadb_ok_ts < CONNECTION_CHECK_TTL:
+            return self._chromadb_ok
         try:
             self.chroma_client.heartbeat()
-            return True
+            self._chromadb_ok = True
         except Exception:
+            self._chromadb_ok = False
+        self._chromadb_ok_ts = now
+        return self._chromadb_ok
+    
+    def _index_activities(self, ids: list, documents: list, metadatas: list, embeddings) -> bool:
+        """Mirror activity embeddings into the vector index (no-op when it is disabled).
+        
+        ChromaDB stays the source of truth, so a failed index write is logged, not
+        raised, and the index is reconciled before its next use (see activity_index).
+        
+        Returns:
+            bool: False if the index write failed
+        """
+        if self.vector_index is None:
+            return True
+        try:
+            for activity_id, document, metadata, embedding in zip(ids, documents, metadatas, embeddings):
+                self.vector_index.upsert(activity_id, embedding, document, _decode_metadata(metadata))
+        except Exception as e:
+            self.logger.warning(f"Failed to update vector index for {len(ids)} activities: {e}")
+            self._index_stale = True
             return False
+        return True
     
-    def add_activity(self, activity) -> bool:
+    def _sync_vector_index(self) -> bool:
+        """Reconcile the vector index with the ChromaDB activities collection.
+        
+        Returns:
+            bool: True if the index now holds exactly the activities in ChromaDB
+            
+        Function:
+            - Compare the activity ids in ChromaDB and in the index
+            - Drop indexed activities that are no longer in ChromaDB (e.g. a wiped volume)
+            - Copy activities missing from the index (e.g. a new index file or a failed write)
+        """
+        if self.vector_index is None:
+            return True
+        try:
+            chroma_ids = set(self.activities_embeddings.get(include=[])["ids"])
+            indexed_ids = self.vector_index.ids()
+            stale = indexed_ids - chroma_ids
+            missing = list(chroma_ids - indexed_ids)
+            for activity_id in stale:
+                self.vector_index.delete(activity_id)
+            if missing:
+                existing = self.activities_embeddings.get(
+                    ids=missing, include=["documents", "metadatas", "embeddings"]
+                )
+        except Exception as e:
+            self.logger.warning(f"Failed to reconcile the vector index with ChromaDB: {e}")
+            self._index_stale = True
+            return False
+        
+        self._index_stale = False
+        if missing and not self._index_activities(
+            existing["ids"], existing["documents"], existing["metadatas"], existing["embeddings"]
+        ):
+            return False
+        if stale or missing:
+            self.logger.info(f"Vector index reconciled: {len(missing)} activities added, {len(stale)} removed")
+        return True
+    
+    def activity_index(self) -> Optional[VectorIndex]:
+        """The vector index to search activities with, or None to search ChromaDB instead.
+        
+        An index that missed a write is reconciled first; if that fails, None is
+        returned so the search does not run against a stale index.
+        """
+        if self.vector_index is None:
+            return None
+        if self._index_stale and not self._sync_vector_index():
+            return None
+        return self.vector_index
+    
+    def _run_cypher(self, query: str, **params) -> list:
+        """Run a parameterized Cypher statement and return its records.
+        
+        The first call also creates the Node.id uniqueness constraint (a no-op if it exists).
+        """
+        with self.neo4j_db.session() as session:
+            if not self._neo4j_schema_ready:
+                try:
+                    session.run(_CYPHER_NODE_ID_CONSTRAINT).consume()
+                except Exception as e:
+                    # e.g. existing duplicate ids; queries still work, just without the index
+                    self.logger.warning(f"Failed to create Node.id uniqueness constraint: {e}")
+                self._neo4j_schema_ready = True
+            return list(session.run(query, **params))
+    
+    def _get_embedding(self, collection, item_id: str) -> Optional[dict]:
+        """Fetch an item from a ChromaDB collection.
+        
+        Returns:
+            Optional[dict]: Result of collection.get for the item (used for rollback), None if not found
+        """
+        existing = collection.get(ids=[item_id], include=["documents", "metadatas"])
+        return existing if existing["ids"] else None
+    
+    async def _commit(self, operation: str, neo4j_call, chroma_call, neo4j_undo, chroma_undo) -> bool:
+        """Run the Neo4j and ChromaDB halves of a change concurrently (two phase commit).
+        
+        Args:
+            operation (str): Description of the change for log messages
+            neo4j_call, chroma_call: Blocking callables applying each half of the change
+            neo4j_undo, chroma_undo: Blocking callables reverting each half
+            
+        Returns:
+            bool: True if both halves succeeded. Otherwise the half that succeeded is
+            reverted and False is returned.
+        """
+        results = await asyncio.gather(
+            asyncio.to_thread(neo4j_call),
+            asyncio.to_thread(chroma_call),
+            return_exceptions=True
+        )
+        halves = list(zip(("Neo4j", "ChromaDB"), results, (neo4j_undo, chroma_undo)))
+        failed = [name for name, result, _ in halves if isinstance(result, Exception)]
+        if not failed:
+            return True
+        
+        for name, result, _ in halves:
+            if isinstance(result, Exception):
+                self.logger.error(f"Failed to {operation} in {name}: {result}")
+        
+        rollbacks = [(name, undo) for name, result, undo in halves if not isinstance(result, Exception)]
+        rollback_results = await asyncio.gather(
+            *(asyncio.to_thread(undo) for _, undo in rollbacks),
+            return_exceptions=True
+        )
+        for (name, _), result in zip(rollbacks, rollback_results):
+            if isinstance(result, Exception):
+                self.logger.error(f"Failed to roll back {operation} in {name}: {result}")
+            else:
+                self.logger.info(f"Rolled back {operation} in {name}")
+        return False
+    
+    async def add_activity(self, activity) -> bool:
         """Add an activity to both Neo4j and embeddings databases.
         
         Args:
@@ -162,11 +485,41 @@ class Schedule:
             - Include the standard activity details for embeddings matrix
             - Use two phase commit (try/except logic adding both, don't add if both don't work)
         """
-        print(f"Adding activity to schedule: {activity}")
-        return False
+        if not self.neo4j_db or self.activities_embeddings is None:
+            self.logger.warning("Neo4j and ChromaDB are both required to add an activity")
+            return False
+        
+        activity_id = str(activity.activity_id)
+        collection = self.activities_embeddings
+        document = _activity_document(activity)
+        metadata = _encode_metadata(_activity_summary(activity))
+        # Embedded once, for both ChromaDB and the vector index
+        try:
+            embedding = await asyncio.to_thread(encode, [document])
+        except Exception as e:
+            self.logger.error(f"Failed to embed activity {activity_id}: {e}")
+            return False
+        
+        committed = await self._commit(
+            f"add activity {activity_id}",
+            neo4j_call=partial(self._run_cypher, _CYPHER_ADD_ACTIVITY, id=activity_id, duration=activity.duration),
+            chroma_call=partial(
+                collection.upsert,
+                ids=[activity_id],
+                documents=[document],
+                metadatas=[metadata],
+                embeddings=embedding.tolist()
+            ),
+            neo4j_undo=partial(self._run_cypher, _CYPHER_REMOVE_ACTIVITY, id=activity_id, relationship_ids=[]),
+            chroma_undo=partial(collection.delete, ids=[activity_id])
+        )
+        if committed:
+            await asyncio.to_thread(self._index_activities, [activity_id], [document], [metadata], embedding)
+            self.logger.info(f"Activity {activity_id} added to schedule")
+        return committed
     
-    def remove_activity(self, activity_id: str) -> bool:
-        """Remove an activity from both databases.
+    async def remove_activity(self, activity_id: str) -> bool:
+        """Remove an activity and the relationships attached to it from both databases.
         
         Args:
             activity_id (str): UUID of the activity to remove
@@ -175,14 +528,115 @@ class Schedule:
             bool: True if activity successfully removed, False if not found or failed
             
         Function:
-            - Remove activity and all its sub-nodes (start, end, intra) from Neo4j
-            - Remove activity from embeddings database
+            - Remove activity and all its sub-nodes (start, end, intra) from Neo4j,
+              together with the relationship nodes linked to its start/end nodes
+            - Remove activity and those relationships from the embeddings database
             - Use two phase commit (try/except logic removing both)
         """
-        print(f"Removing activity from schedule: {activity_id}")
-        return False
+        if not self.neo4j_db or self.activities_embeddings is None or self.relationships_embeddings is None:
+            self.logger.warning("Neo4j and ChromaDB are both required to remove an activity")
+            return False
+        
+        activity_id = str(activity_id)
+        try:
+            existing, records = await asyncio.gather(
+                asyncio.to_thread(self._get_embedding, self.activities_embeddings, activity_id),
+                asyncio.to_thread(self._run_cypher, _CYPHER_ACTIVITY_RELATIONSHIPS, id=activity_id)
+            )
+        except Exception as e:
+            self.logger.error(f"Failed to look up activity {activity_id}: {e}")
+            return False
+        if existing is None:
+            self.logger.warning(f"Activity {activity_id} not found")
+            return False
+        
+        relationship_ids = [record["id"] for record in records]
+        attached = None
+        if relationship_ids:
+            try:
+                attached = await asyncio.to_thread(
+                    self.relationships_embeddings.get, ids=relationship_ids, include=["documents", "metadatas"]
+                )
+            except Exception as e:
+                self.logger.error(f"Failed to look up relationships of activity {activity_id} in ChromaDB: {e}")
+                return False
+        
+        committed = await self._commit(
+            f"remove activity {activity_id}",
+            neo4j_call=partial(
+                self._run_cypher, _CYPHER_REMOVE_ACTIVITY, id=activity_id, relationship_ids=relationship_ids
+            ),
+            chroma_call=partial(self._delete_activity_embeddings, activity_id, relationship_ids),
+            neo4j_undo=partial(self._restore_activity_nodes, activity_id, existing, attached),
+            chroma_undo=partial(self._restore_activity_embeddings, existing, attached)
+        )
+        if committed:
+            if self.vector_index is not None:
+                try:
+                    await asyncio.to_thread(self.vector_index.delete, activity_id)
+                except Exception as e:
+                    self.logger.warning(f"Failed to remove activity {activity_id} from vector index: {e}")
+                    self._index_stale = True
+            self.logger.info(
+                f"Activity {activity_id} removed from schedule with {len(relationship_ids)} relationships"
+            )
+        return committed
+    
+    def _delete_activity_embeddings(self, activity_id: str, relationship_ids: list):
+        """ChromaDB half of remove_activity."""
+        if relationship_ids:
+            self.relationships_embeddings.delete(ids=relationship_ids)
+        self.activities_embeddings.delete(ids=[activity_id])
+    
+    def _restore_activity_embeddings(self, existing: dict, attached: Optional[dict]):
+        """Undo _delete_activity_embeddings from the records read before the removal."""
+        self.activities_embeddings.upsert(
+            ids=existing["ids"], documents=existing["documents"], metadatas=existing["metadatas"]
+        )
+        if attached and attached["ids"]:
+            self.relationships_embeddings.upsert(
+                ids=attached["ids"], documents=attached["documents"], metadatas=attached["metadatas"]
+            )
+    
+    def _restore_activity_nodes(self, activity_id: str, existing: dict, attached: Optional[dict]):
+        """Undo the Neo4j half of remove_activity.
+        
+        Relationships are rebuilt from their ChromaDB metadata, so a relationship
+        node with no ChromaDB record is not restored.
+        """
+        metadata = _decode_metadata(existing["metadatas"][0])
+        self._run_cypher(_CYPHER_ADD_ACTIVITY, id=activity_id, duration=metadata.get("duration", 0))
+        if not attached:
+            return
+        for relationship_id, relationship_metadata in zip(attached["ids"], attached["metadatas"]):
+            relationship = _decode_metadata(relationship_metadata)
+            self._add_relationship_node(
+                relationship_id,
+                relationship["type"],
+                relationship.get("lag", 0),
+                relationship["predecessor"]["activity_id"],
+                relationship["successor"]["activity_id"]
+            )
+    
+    def _add_relationship_node(self, relationship_id: str, relationship_type: str, lag,
+                               predecessor_id: str, successor_id: str):
+        """Create a relationship node and its edges in Neo4j.
+        
+        Raises:
+            LookupError: If the predecessor or successor activity does not exist
+        """
+        predecessor_prefix, successor_prefix = _RELATIONSHIP_ENDPOINTS[relationship_type]
+        records = self._run_cypher(
+            _CYPHER_ADD_RELATIONSHIP,
+            id=relationship_id,
+            lag=lag,
+            predecessor_node=predecessor_prefix + predecessor_id,
+            successor_node=successor_prefix + successor_id
+        )
+        if not records:
+            raise LookupError("predecessor or successor activity not found")
     
-    def add_relationship(self, relationship) -> bool:
+    async def add_relationship(self, relationship) -> bool:
         """Add a relationship to both databases.
         
         Args:
@@ -196,10 +650,42 @@ class Schedule:
             - Create directed edges in Neo4j based on relationship type (FS, SS, FF, SF)
             - Use two phase commit (try/except logic adding both, don't add if both don't work)
         """
-        print(f"Adding relationship to schedule: {relationship}")
-        return False
+        if not self.neo4j_db or self.relationships_embeddings is None:
+            self.logger.warning("Neo4j and ChromaDB are both required to add a relationship")
+            return False
+        
+        relationship_id = str(relationship.id)
+        relationship_type = _relationship_type(relationship)
+        collection = self.relationships_embeddings
+        committed = await self._commit(
+            f"add relationship {relationship_id}",
+            neo4j_call=partial(
+                self._add_relationship_node,
+                relationship_id,
+                relationship_type,
+                relationship.lag,
+                str(relationship.predecessor.activity_id),
+                str(relationship.successor.activity_id)
+            ),
+            chroma_call=partial(
+                collection.upsert,
+                ids=[relationship_id],
+                documents=[_relationship_document(relationship)],
+                metadatas=[_encode_metadata({
+                    "type": relationship_type,
+                    "lag": relationship.lag,
+                    "predecessor": _activity_summary(relationship.predecessor),
+                    "successor": _activity_summary(relationship.successor),
+                })]
+            ),
+            neo4j_undo=partial(self._run_cypher, _CYPHER_REMOVE_RELATIONSHIP, id=relationship_id),
+            chroma_undo=partial(collection.delete, ids=[relationship_id])
+        )
+        if committed:
+            self.logger.info(f"Relationship {relationship_id} added to schedule")
+        return committed
     
-    def remove_relationship(self, relationship_id: str) -> bool:
+    async def remove_relationship(self, relationship_id: str) -> bool:
         """Remove a relationship from both databases.
         
         Args:
@@ -213,8 +699,44 @@ class Schedule:
             - Remove relationship from embeddings database
             - Use two phase commit (try/except logic removing both)
         """
-        print(f"Removing relationship from schedule: {relationship_id}")
-        return False
+        if not self.neo4j_db or self.relationships_embeddings is None:
+            self.logger.warning("Neo4j and ChromaDB are both required to remove a relationship")
+            return False
+        
+        relationship_id = str(relationship_id)
+        collection = self.relationships_embeddings
+        try:
+            existing = await asyncio.to_thread(self._get_embedding, collection, relationship_id)
+        except Exception as e:
+            self.logger.error(f"Failed to look up relationship {relationship_id} in ChromaDB: {e}")
+            return False
+        if existing is None:
+            self.logger.warning(f"Relationship {relationship_id} not found")
+            return False
+        metadata = _decode_metadata(existing["metadatas"][0])
+        
+        committed = await self._commit(
+            f"remove relationship {relationship_id}",
+            neo4j_call=partial(self._run_cypher, _CYPHER_REMOVE_RELATIONSHIP, id=relationship_id),
+            chroma_call=partial(collection.delete, ids=[relationship_id]),
+            neo4j_undo=partial(
+                self._add_relationship_node,
+                relationship_id,
+                metadata["type"],
+                metadata.get("lag", 0),
+                metadata["predecessor"]["activity_id"],
+                metadata["successor"]["activity_id"]
+            ),
+            chroma_undo=partial(
+                collection.upsert,
+                ids=existing["ids"],
+                documents=existing["documents"],
+                metadatas=existing["metadatas"]
+            )
+        )
+        if committed:
+            self.logger.info(f"Relationship {relationship_id} removed from schedule")
+        return committed
     
     def update_graph(self) -> bool:
         """Recompute NetworkX DiGraph from Neo4j database.
@@ -226,9 +748,26 @@ class Schedule:
             - Query Neo4j database for all nodes and edges
             - Rebuild NetworkX DiGraph with current schedule topology
             - Called when schedule changes to keep graph representation current
+            - Nodes and edges arrive in a single query, streamed NEO4J_FETCH_SIZE records at a time
         """
-        print("Updating NetworkX graph from Neo4j database...")
-        return False
+        if not self.neo4j_db:
+            self.logger.warning("Neo4j not available, cannot update graph")
+            return False
+        
+        try:
+            edges = []
+            with self.neo4j_db.session() as session:
+                result = session.run(_CYPHER_GRAPH_EDGES)
+                while records := result.fetch(NEO4J_FETCH_SIZE):
+                    edges.extend((r["source"], r["target"], r["weight"]) for r in records)
+        except Exception as e:
+            self.logger.error(f"Failed to load graph from Neo4j: {e}")
+            return False
+        
+        self.graph.clear()
+        self.graph.add_weighted_edges_from(edges)
+        self.logger.info(f"NetworkX graph updated with {len(edges)} edges")
+        return True
     
     def compute_critical_path(self) -> list:
         """Compute the critical path using NetworkX algorithms.
@@ -275,15 +814,15 @@ class Schedule:
             query (str): Natural language query describing activities to find
             
         Returns:
-            list: List of ActivitySchema objects matching the query, ranked by similarity
+            list: Activity records (activity_id, name, description, duration) matching the query,
+                ranked by similarity
             
         Function:
             - Use vector embeddings to find activities semantically similar to query
             - Search through activity names, descriptions, and durations
             - Return ranked results for LLM decision making
         """
-        print(f"Searching activities for: {query}")
-        return []
+        return self._query_collection(self.activities_embeddings, query)
     
     def semantic_search_relationships(self, query: str) -> list:
         """Search relationships using semantic similarity.
@@ -292,12 +831,37 @@ class Schedule:
             query (str): Natural language query describing relationships to find
             
         Returns:
-            list: List of RelationshipSchema objects matching the query, ranked by similarity
+            list: Relationship records (id, type, lag, predecessor, successor) matching the query,
+                ranked by similarity
             
         Function:
             - Use vector embeddings to find relationships semantically similar to query
             - Search through relationship types, predecessor/successor activity info, and lags
             - Return ranked results for LLM decision making
         """
-        print(f"Searching relationships for: {query}")
-        return []
\ No newline at end of file
+        return self._query_collection(self.relationships_embeddings, query)
+    
+    def _query_collection(self, collection, query: str) -> list:
+        """Run a nearest-neighbour query against a ChromaDB collection.
+        
+        Returns:
+            list: Stored metadata of the closest items (plus their "id"), ranked by similarity
+        """
+        if collection is None:
+            self.logger.debug("ChromaDB not available, skipping semantic search")
+            return []
+        
+        try:
+            results = collection.query(
+                query_embeddings=[list(_embed(query.strip().lower()))],
+                n_results=SEMANTIC_SEARCH_RESULTS,
+                include=["metadatas"]
+            )
+        except Exception as e:
+            self.logger.error(f"Semantic search failed for '{query}': {e}")
+            return []
+        
+        return [
+            {"id": item_id, **_decode_metadata(metadata)}
+            for item_id, metadata in zip(results["ids"][0], results["metadatas"][0])
+        ]
\ No newline at end of file
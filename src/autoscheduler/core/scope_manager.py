@@ -4,43 +4,185 @@ ScopeManager class for autoscheduler2.
 Interface between CLI and schedule logic. Parses user requests into scope changes.
 """
 
+import asyncio
+import inspect
 import logging
+from typing import TYPE_CHECKING
+import orjson
+
+from ..llm.embeddings import encode
+from .schedule import SEMANTIC_SEARCH_RESULTS
+
+if TYPE_CHECKING:
+    from ..llm import LLMClient
+    from ..llm.structured import ToolCallStruct
+
+# Handle of the scope toolkit registered with the LLM client (see ScopeManager.llm)
+SCOPE_TOOLKIT = "scope"
+
+
+def _scope_tool(name: str, description: str, activity_id: bool = False) -> dict:
+    """OpenAI tool config for a scope handler taking a prompt (and optionally an activity_id).
+    
+    The schema is strict, so the model can only send the handler's own arguments;
+    strict mode requires every property, so activity_id is nullable instead.
+    """
+    properties = {"prompt": {"type": "string", "description": "The part of the user's request this call handles"}}
+    if activity_id:
+        properties["activity_id"] = {
+            "type": ["string", "null"],
+            "description": "UUID of the activity, or null if the user did not give one"
+        }
+    return {
+        "type": "function",
+        "function": {
+            "name": name,
+            "description": description,
+            "strict": True,
+            "parameters": {
+                "type": "object",
+                "properties": properties,
+                "required": list(properties),
+                "additionalProperties": False,
+            },
+        },
+    }
+
+
+# Tools for the scope handlers in ScopeManager._DISPATCH_TABLE
+SCOPE_TOOLS = [
+    _scope_tool("add_activity", "Add a new activity to the schedule"),
+    _scope_tool("delete_activity", "Delete an activity and its relationships", activity_id=True),
+    _scope_tool(
+        "dissolve_activity",
+        "Delete an activity but reattach its predecessors to its successors",
+        activity_id=True
+    ),
+    _scope_tool("add_relationship", "Add a dependency between two activities"),
+    _scope_tool("delete_relationship", "Delete a dependency between two activities"),
+]
 
 
 class ScopeManager:
     """Interface between CLI and schedule. Parses user requests into scope changes."""
     
-    def __init__(self, schedule):
-        """Initialize ScopeManager with a Schedule instance."""
-        # Set up logging
-        self.logger = logging.getLogger('autoscheduler.core.scope_manager')
-        self.logger.setLevel(logging.INFO)
-        
-        # Create console handler if no handlers exist
-        if not self.logger.handlers:
-            handler = logging.StreamHandler()
-            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-            handler.setFormatter(formatter)
-            self.logger.addHandler(handler)
-        
-        self.logger.info("Initializing ScopeManager...")
+    # LLM tool-call name -> handler method, resolved by _call_tool with one dict lookup
+    _DISPATCH_TABLE = {
+        "add_activity": "_add_activity",
+        "delete_activity": "_delete_activity",
+        "dissolve_activity": "_dissolve_activity",
+        "add_relationship": "_add_relationship",
+        "delete_relationship": "_delete_relationship",
+    }
+    
+    def __init__(self, schedule, llm=None):
+        """Initialize ScopeManager with a Schedule instance and optional LLMClient."""
+        # Handlers are configured once at startup (see autoscheduler.logging_config)
+        self.logger = logging.getLogger(__name__)
         
         # Store schedule reference
         self.schedule = schedule
-        self.logger.info(f"ScopeManager linked to Schedule instance successfully")
+        self._llm = llm
+        self._toolkit_registered = False
+        
+        # Event loop for the async scope operations, kept across CLI actions (see _run)
+        self._loop = None
         
         # Log database connection status
+        info = self.logger.isEnabledFor(logging.INFO)
         if hasattr(schedule, 'is_neo4j_connected') and schedule.is_neo4j_connected:
-            self.logger.info("Neo4j database available for scope operations")
+            if info:
+                self.logger.info("Neo4j database available for scope operations")
         else:
             self.logger.warning("Neo4j database not available - operations will use in-memory graph only")
             
         if hasattr(schedule, 'is_chromadb_connected') and schedule.is_chromadb_connected:
-            self.logger.info("ChromaDB vector database available for semantic search")
+            if info:
+                self.logger.info("ChromaDB vector database available for semantic search")
         else:
             self.logger.warning("ChromaDB not available - semantic search operations will be limited")
+    
+    @property
+    def llm(self) -> 'LLMClient':
+        """LLM client (the process-wide LLMClient.shared() unless one was passed in).
         
-        self.logger.info("ScopeManager initialization completed")
+        Resolved on first use, so the CLI starts without OpenAI configured and
+        without importing openai/pydantic for non-LLM commands. SCOPE_TOOLS are
+        registered with it once, as SCOPE_TOOLKIT.
+        """
+        if self._llm is None:
+            from ..llm import LLMClient
+            self._llm = LLMClient.shared()
+        if not self._toolkit_registered:
+            self._llm.register_toolkit(SCOPE_TOOLKIT, SCOPE_TOOLS)
+            self._toolkit_registered = True
+        return self._llm
+    
+    def _run(self, coro):
+        """Run a coroutine to completion on this manager's event loop.
+        
+        The loop is created on first use and reused by every later call, so the
+        LLM client's connection pool, which is bound to the loop that opened it,
+        stays open and warm between CLI actions.
+        """
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(coro)
+    
+    async def _hybrid_search(self, prompt: str, k: int = SEMANTIC_SEARCH_RESULTS) -> list:
+        """Find the activities best matching a prompt by BM25 and cosine similarity.
+        
+        Args:
+            prompt (str): Natural language description of the activities to find
+            k (int): Number of activities to return
+            
+        Returns:
+            list: Activity records ({"id", "activity_id", "name", ...}), best first
+            
+        Function:
+            - Embed the prompt with the local batch encoder and query the schedule's
+              sqlite-vec index; exact terms in the prompt (e.g. "floor 4") also
+              count, so fewer off-target candidates reach the LLM decision loop
+            - With MEMOS_USE_VEC_INDEX=false, fall back to the ChromaDB collection
+        """
+        index = await asyncio.to_thread(self.schedule.activity_index)
+        if index is None:
+            return await asyncio.to_thread(self.schedule.semantic_search_activities, prompt)
+        
+        embedding = await asyncio.to_thread(encode, [prompt.strip().lower()])
+        return await asyncio.to_thread(index.hybrid_search, prompt, embedding[0], k)
+    
+    async def _decide(self, instruction: str, kind: str, candidates: list) -> list:
+        """Ask the LLM, concurrently for every candidate, whether an instruction applies to it.
+        
+        Args:
+            instruction (str): Derived prompt (e.g. the removal prompt)
+            kind (str): "activity" or "relationship", used in the decision prompt
+            candidates (list): Records returned by the schedule's semantic search
+            
+        Returns:
+            list: One entry per candidate: True/False, or the exception raised for that candidate
+            (an empty or missing completion counts as "no", so the candidate is left alone)
+        """
+        tasks = [
+            self.llm.prompt(self._decision_messages(instruction, kind, candidate), system="decide_scope")
+            for candidate in candidates
+        ]
+        responses = await asyncio.gather(*tasks, return_exceptions=True)
+        return [
+            response if isinstance(response, Exception) else (response or "").strip().lower().startswith("yes")
+            for response in responses
+        ]
+    
+    @staticmethod
+    def _decision_messages(instruction: str, kind: str, candidate: dict) -> list:
+        """Build the yes/no question for one schedule item (sent after the "decide_scope" system prompt)."""
+        return [
+            {
+                "role": "user",
+                "content": f"Instruction: {instruction}\n{kind.capitalize()}: {orjson.dumps(candidate).decode()}"
+            },
+        ]
     
     def _dispatch(self) -> bool:
         """Entry point for open ended user prompts.
@@ -51,22 +193,77 @@ class ScopeManager:
             - Prompt user for natural language commands
             - Call _separate_prompt to split into additions/removals
             - Call _read_scope with toolkit for removals/additions
+            - Route each resulting tool call to its handler with _call_tool
             - Present buffer memory to user for acceptance/rejection
             - If rejected, ask for feedback and repeat process
         
         Returns:
-            bool: True if user accepts changes, False if user rejects or cancels
+            bool: True if every requested tool call succeeded, False if any failed,
+            none was requested or the user entered no prompt
             
         Examples:
             - "Add activities for excavation on floor 1"
             - "Delete all activities on the second floor"
+            
+        Note:
+            Only reading the prompt and routing its tool calls are implemented so far;
+            the whole prompt goes to _read_scope, and there is no buffer memory or
+            accept/reject step yet.
         """
         self.logger.debug("_dispatch called - entering natural language prompt mode")
-        print("Natural language prompt interface not implemented yet.")
-        print("This will allow users to enter commands like:")
-        print("- 'Add activities for excavation on floor 1'")
-        print("- 'Delete all activities on the second floor'")
-        return False
+        prompt = input("Describe the scope change: ").strip()
+        if not prompt:
+            print("No prompt entered.")
+            return False
+        
+        try:
+            tool_calls = self._run(self._read_scope(prompt, SCOPE_TOOLKIT))
+        except Exception as e:
+            self.logger.error(f"Failed to read scope from '{prompt}': {e}")
+            return False
+        
+        if not tool_calls:
+            print("No scope changes found in the prompt.")
+            return False
+        
+        # Handlers run one at a time: each may prompt the user
+        results = [self._call_tool(tool_call) for tool_call in tool_calls]
+        return all(results)
+    
+    def _call_tool(self, tool_call) -> bool:
+        """Run the handler named by an LLM tool call.
+        
+        Args:
+            tool_call (ToolCallStruct): Tool call returned by LLMClient.prompt_with_tools
+            
+        Returns:
+            bool: The handler's result, or False if the tool name is unknown
+            
+        Function:
+            - Look up the handler in _DISPATCH_TABLE
+            - Parse the JSON arguments once and pass them as keyword arguments
+              (False if they are not a valid JSON object or do not fit the handler)
+        """
+        method_name = self._DISPATCH_TABLE.get(tool_call.function.name)
+        if method_name is None:
+            self.logger.warning("Unknown tool call '%s'", tool_call.function.name)
+            return False
+        try:
+            arguments = tool_call.function.parsed_arguments()
+        except orjson.JSONDecodeError as e:
+            self.logger.warning("Invalid arguments for tool call '%s': %s", tool_call.function.name, e)
+            return False
+        if not isinstance(arguments, dict):
+            self.logger.warning("Arguments for tool call '%s' are not a JSON object", tool_call.function.name)
+            return False
+        
+        handler = getattr(self, method_name)
+        try:
+            bound = inspect.signature(handler).bind(**arguments)
+        except TypeError as e:
+            self.logger.warning("Invalid arguments for tool call '%s': %s", tool_call.function.name, e)
+            return False
+        return handler(*bound.args, **bound.kwargs)
     
     def _separate_prompt(self, prompt: str) -> tuple[str, str]:
         """Separate an unmodified user prompt into scope additions/removals.
@@ -88,26 +285,28 @@ class ScopeManager:
         """
         return ("", "")
     
-    def _read_scope(self, prompt: str, toolkit: list) -> str:
-        """Creates a function call based on a user prompt and a set of tools.
+    async def _read_scope(self, prompt: str, toolkit: str) -> list['ToolCallStruct']:
+        """Creates function calls based on a user prompt and a set of tools.
         
         Args:
             prompt (str): Derived prompt representing either removal/additions
-            toolkit (list): LLM agent tools available
+            toolkit (str): Handle of a toolkit registered with the LLM client (e.g. SCOPE_TOOLKIT)
             
         Returns:
-            str: Function call to make to process the activities
+            list[ToolCallStruct]: Function calls to make to process the activities
+            (empty if the model requested none)
             
         Function:
             Use AsyncOpenAI tool calling agent with tool-kit to parse the scope prompt
-            into the most fitting function call. Designed to be used for both removal/additions of scope.
+            into the most fitting function calls. Designed to be used for both removal/additions of scope.
             
         Accessed via:
             _dispatch
         """
-        return ""
+        messages = [{"role": "user", "content": prompt}]
+        return await self.llm.prompt_with_tools_named(messages, toolkit, system="read_scope")
     
-    def _remove_scope(self, removal_prompt: str) -> bool:
+    async def _remove_scope(self, removal_prompt: str) -> bool:
         """Main loop handling scope removals.
         
         Args:
@@ -123,17 +322,37 @@ class ScopeManager:
                 * Create function call (_delete_relationship(**params)) as string
                 * Add string to buffer memory and safely call function to update db
             - Process activity removals:
-                * Use semantic search to identify high-level activity nodes that pertain to removal prompt
+                * Use hybrid (BM25 + semantic) search to identify high-level activity nodes that pertain to removal prompt
                 * For each node identified, use LLM to decide whether it should be removed
                 * Create function call (_delete_activity(**params)) as string
                 * Add string to buffer memory and safely call function to update db
+            - The LLM decisions for all candidates of a kind are issued concurrently
+              (bounded by the LLMClient's OPENAI_MAX_CONCURRENCY semaphore)
                 
         Accessed via:
             _dispatch
         """
-        return False
+        activities, relationships = await asyncio.gather(
+            self._hybrid_search(removal_prompt),
+            asyncio.to_thread(self.schedule.semantic_search_relationships, removal_prompt)
+        )
+        
+        success = True
+        for kind, candidates, key, remove in (
+            ("relationship", relationships, "id", self.schedule.remove_relationship),
+            ("activity", activities, "activity_id", self.schedule.remove_activity),
+        ):
+            decisions = await self._decide(removal_prompt, kind, candidates)
+            for candidate, decision in zip(candidates, decisions):
+                if isinstance(decision, Exception):
+                    self.logger.error(f"Removal decision failed for {kind} {candidate[key]}: {decision}")
+                    success = False
+                elif decision:
+                    self.logger.info("Removing %s %s", kind, candidate[key])
+                    success = await remove(candidate[key]) and success
+        return success
     
-    def _add_scope(self, additions_prompt: str) -> bool:
+    async def _add_scope(self, additions_prompt: str) -> bool:
         """Adds new scope to the schedule based on an open-ended user prompt.
         
         Args:
@@ -144,9 +363,11 @@ class ScopeManager:
             
         Function:
             - Add activities to the schedule based on the prompt:
-                * Use LLM-prompt function to output JSON with schema: 
-                  {'activity_name': <>, 'description': <>, 'duration': <>}
-                * For each activity: give UUID, parse into ActivitySchema, pass to _add_activity
+                * Use a single parse_structured_stream call to generate every activity as an
+                  ActivityBatch: {'activities': [{'name': <>, 'description': <>, 'duration': <>}, ...]}
+                * Build an ActivitySchema from each ActivityDraft as soon as it is decoded
+                  (the model never sees activity_id, so every activity gets a fresh UUID)
+                  and start adding it while the rest of the batch streams in
                 * Add function call _add_activity(<ActivitySchema>) to buffer memory
             - Add relationships to the schedule:
                 * Use embeddings DB to query (via semantic search) activities that might be 
@@ -160,8 +381,29 @@ class ScopeManager:
                 
         Accessed via:
             _dispatch
+            
+        Note:
+            Only activity additions are implemented so far; relationship additions are not.
         """
-        return False
+        from ..models import ActivityBatch, ActivityDraft, ActivitySchema
+        
+        messages = [{"role": "user", "content": f"Generate all activities for: {additions_prompt}"}]
+        additions = []
+        try:
+            async for draft in self.llm.parse_structured_stream(
+                messages, ActivityBatch, ActivityDraft, 'activities.item', system="generate_activities"
+            ):
+                activity = ActivitySchema(name=draft.name, description=draft.description, duration=draft.duration)
+                self.logger.info("Adding activity %s: %s", activity.activity_id, activity.name)
+                additions.append(asyncio.create_task(self.schedule.add_activity(activity)))
+        except Exception as e:
+            self.logger.error(f"Failed to generate activities for '{additions_prompt}': {e}")
+            # Let the additions already started finish their two phase commits
+            await asyncio.gather(*additions)
+            return False
+        
+        results = await asyncio.gather(*additions)
+        return all(results)
     
     def _add_activity(self, prompt: str = None, activity = None) -> bool:
         """Adds a new activity to the Schedule.
@@ -188,7 +430,7 @@ class ScopeManager:
             - CLI (user chooses add activity option from CLI)
             - Dispatch (LLM interprets prompt as call to _add_activity)
         """
-        self.logger.debug(f"_add_activity called with prompt='{prompt}', activity='{activity}'")
+        self.logger.debug("_add_activity called with prompt='%s', activity='%s'", prompt, activity)
         print("Add activity functionality not implemented yet.")
         print("This will allow adding activities with name, description, and duration.")
         return False
@@ -5,6 +5,13 @@ Provides LLM client functionality for natural language processing,
 tool calling, and structured output parsing.
 """
 
-from .llm_client import LLMClient
+__all__ = ['LLMClient']
 
-__all__ = ['LLMClient']
\ No newline at end of file
+
+def __getattr__(name):
+    # LLMClient pulls in openai, pydantic and tenacity; import it on first access
+    # so importing autoscheduler.llm.embeddings or .vector_index stays cheap
+    if name == 'LLMClient':
+        from .llm_client import LLMClient
+        return LLMClient
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,63 @@
+"""
+Local sentence embeddings for autoscheduler2.
+
+Provides a lazily loaded all-MiniLM-L6-v2 encoder shared by the whole process.
+"""
+
+import os
+import threading
+from typing import Iterable
+import numpy as np
+
+# Sentence-transformers model used for local embeddings
+EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
+
+# Dimension stored in the vector databases; must match EMBEDDING_MODEL's output
+EMBEDDING_DIM = int(os.getenv('EMBEDDING_DIM', '384'))
+
+
+# Loaded encoder (see get_encoder); the lock makes concurrent first calls load it once
+_ENCODER = None
+_ENCODER_LOCK = threading.Lock()
+
+
+def get_encoder():
+    """Load the SentenceTransformer model on first use.
+    
+    encode runs in worker threads (asyncio.to_thread), so several threads can
+    ask for the encoder at once; only the first loads it, the others wait.
+    """
+    global _ENCODER
+    if _ENCODER is None:
+        with _ENCODER_LOCK:
+            if _ENCODER is None:
+                from sentence_transformers import SentenceTransformer
+                encoder = SentenceTransformer(EMBEDDING_MODEL)
+                
+                dim = encoder.get_sentence_embedding_dimension()
+                if dim != EMBEDDING_DIM:
+                    raise ValueError(
+                        f"{EMBEDDING_MODEL} produces {dim}-d embeddings but EMBEDDING_DIM is {EMBEDDING_DIM}"
+                    )
+                _ENCODER = encoder
+    return _ENCODER
+
+
+def encode(texts: Iterable[str], batch_size: int = 64) -> np.ndarray:
+    """
+    Embed texts in batches.
+    
+    Args:
+        texts: Strings to embed
+        batch_size: Number of texts encoded per forward pass
+        
+    Returns:
+        float32 array of shape (len(texts), EMBEDDING_DIM) with L2-normalized rows
+    """
+    embeddings = get_encoder().encode(
+        list(texts),
+        batch_size=batch_size,
+        normalize_embeddings=True,
+        convert_to_numpy=True
+    )
+    return np.ascontiguousarray(embeddings, dtype=np.float32)
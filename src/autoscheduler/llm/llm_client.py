@@ -5,71 +5,324 @@ Provides functionality for parsing, tool calling, and open ended prompting
 using the OpenAI API.
 """
 
+from __future__ import annotations
+
 import os
+import atexit
 import logging
-from typing import List, Dict, Any, Optional, Type, TypeVar
-from openai import AsyncOpenAI
-from pydantic import BaseModel
-from dotenv import load_dotenv
+import asyncio
+import hashlib
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from functools import cache, partial
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Dict, Any, AsyncIterator, Awaitable, Callable, Optional, Type, TypeVar
+import orjson
 
-# Load environment variables
-load_dotenv()
+# openai, httpx, tenacity, ijson, msgspec and .structured (pydantic) are imported
+# where first used, so importing this module (e.g. for LLMClient.shared) is cheap
+if TYPE_CHECKING:
+    from pydantic import BaseModel
+    from openai import AsyncOpenAI
+    from tenacity import AsyncRetrying
+    from .structured import ToolCallStruct
 
 # Type variable for Pydantic models
-T = TypeVar('T', bound=BaseModel)
+T = TypeVar('T', bound='BaseModel')
+
+@dataclass(frozen=True)
+class _Cfg:
+    """LLMClient settings read from the environment."""
+    
+    api_key: str
+    model: str
+    max_concurrency: int
+
+
+@cache
+def _config() -> _Cfg:
+    """Load .env and read the OpenAI settings once per process.
+    
+    Raises:
+        ValueError: If OPENAI_API_KEY is not set (not cached, so a later call re-checks)
+    """
+    from dotenv import load_dotenv
+    
+    load_dotenv()
+    api_key = os.getenv('OPENAI_API_KEY')
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY not found in environment variables")
+    return _Cfg(
+        api_key=api_key,
+        model=os.getenv('OPENAI_MODEL', 'gpt-4o-mini'),
+        max_concurrency=int(os.getenv('OPENAI_MAX_CONCURRENCY', '16'))
+    )
+
+
+# Fixed system prompts, one <name>.txt per prompt (see LLMClient._SYSTEM_PROMPTS)
+PROMPTS_DIR = Path(__file__).parent / 'prompts'
+
+
+def _load_system_prompts() -> Dict[str, str]:
+    """Read every system prompt in PROMPTS_DIR, keyed by file stem."""
+    return {path.stem: path.read_text(encoding='utf-8').strip() for path in sorted(PROMPTS_DIR.glob('*.txt'))}
+
+
+# Process-wide client returned by LLMClient.shared()
+_SHARED: Optional['LLMClient'] = None
+
+
+def _close_shared():
+    """Close the shared client's HTTP connection pool at interpreter exit."""
+    if _SHARED is None or _SHARED._client is None:
+        return
+    loop = _SHARED._client_loop
+    if loop.is_closed() or loop.is_running():
+        # Connections bound to an already closed event loop are simply dropped
+        return
+    try:
+        loop.run_until_complete(_SHARED._client.close())
+    except Exception:
+        pass
 
 
 class LLMClient:
     """Provides functionality for parsing, tool calling, and open ended prompting."""
     
+    # System prompts selectable with system=<name>, read once at import. OpenAI's
+    # automatic prompt caching only applies to a byte-identical prefix, so these are
+    # sent verbatim as the first message: never interpolate or timestamp them.
+    _SYSTEM_PROMPTS: Dict[str, str] = _load_system_prompts()
+    
     def __init__(self):
         """Initialize the LLM client with OpenAI configuration."""
-        # Set up logging
-        self.logger = logging.getLogger('autoscheduler.llm.client')
-        self.logger.setLevel(logging.INFO)
+        # Handlers are configured once at startup (see autoscheduler.logging_config)
+        self.logger = logging.getLogger(__name__)
+        
+        # Get OpenAI configuration from environment (read once per process)
+        cfg = _config()
+        self.api_key = cfg.api_key
+        self.default_model = cfg.model
+        
+        # AsyncOpenAI client and the event loop its pool is bound to (see client)
+        self._client = None
+        self._client_loop = None
+        
+        # Cap on concurrent OpenAI requests (see _semaphore)
+        self.max_concurrency = cfg.max_concurrency
+        self._sem = None
+        self._sem_loop = None
+        
+        # Identical requests in flight share one API call (see _coalesce)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        
+        # Registered toolkits: name -> (tools, hash) (see register_toolkit)
+        self._toolkits: Dict[str, tuple] = {}
+        
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(f"LLMClient initialized with model: {self.default_model}")
+    
+    @classmethod
+    def shared(cls) -> 'LLMClient':
+        """
+        Process-wide LLMClient, created on first call.
+        
+        Sharing one client shares its connection pool (TLS sessions, keep-alive
+        and HTTP/2 connections), the semaphore bounding concurrent requests and
+        the in-flight request map.
+        """
+        global _SHARED
+        if _SHARED is None:
+            _SHARED = cls()
+            atexit.register(_close_shared)
+        return _SHARED
+    
+    def _with_system(self, messages: List[Dict[str, str]], system: Optional[str]) -> List[Dict[str, str]]:
+        """Prepend the named system prompt (if any) to messages.
+        
+        Raises:
+            KeyError: If system does not name a file in PROMPTS_DIR
+        """
+        if system is None:
+            return messages
+        return [{"role": "system", "content": self._SYSTEM_PROMPTS[system]}, *messages]
+    
+    @property
+    def client(self) -> 'AsyncOpenAI':
+        """AsyncOpenAI client for the running event loop, rebuilt when the loop changes.
+        
+        httpx binds pooled connections to the loop that opened them, so a pool
+        reused from a closed loop fails with "Event loop is closed". Callers that
+        run on one long-lived loop (e.g. ScopeManager) keep one warm pool.
+        """
+        loop = asyncio.get_running_loop()
+        if self._client_loop is not loop:
+            self._client = self._build_client()
+            self._client_loop = loop
+        return self._client
+    
+    def _build_client(self) -> 'AsyncOpenAI':
+        """Create the AsyncOpenAI client and its HTTP connection pool."""
+        import httpx
+        from openai import AsyncOpenAI, DefaultAsyncHttpxClient
         
-        # Create console handler if no handlers exist
-        if not self.logger.handlers:
-            handler = logging.StreamHandler()
-            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-            handler.setFormatter(formatter)
-            self.logger.addHandler(handler)
+        # The pool is sized for concurrent fan-out and HTTP/2 multiplexes those
+        # requests over few connections. Retries are handled by _create, so the
+        # SDK's own (which sleep inside the semaphore) are off
+        return AsyncOpenAI(
+            api_key=self.api_key,
+            max_retries=0,
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+                http2=True,
+                timeout=httpx.Timeout(60.0, connect=5.0)
+            )
+        )
+    
+    def _semaphore(self) -> asyncio.Semaphore:
+        """Semaphore bounding concurrent requests, recreated per event loop.
         
-        # Get OpenAI configuration from environment
-        self.api_key = os.getenv('OPENAI_API_KEY')
-        if not self.api_key:
-            raise ValueError("OPENAI_API_KEY not found in environment variables")
+        The client may outlive an event loop (e.g. one asyncio.run per CLI action),
+        and a semaphore cannot be shared across loops.
+        """
+        loop = asyncio.get_running_loop()
+        if self._sem_loop is not loop:
+            self._sem = asyncio.Semaphore(self.max_concurrency)
+            self._sem_loop = loop
+        return self._sem
+    
+    async def _coalesce(self, key_parts: List[Any], call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run call() once per distinct in-flight request.
         
-        self.default_model = os.getenv('OPENAI_MODEL', 'gpt-4o-mini')
+        Concurrent callers with the same key_parts await the first caller's
+        result (or exception) instead of issuing their own API request. The
+        entry is dropped as soon as the call finishes, so this only dedupes
+        overlapping calls.
         
-        # Initialize AsyncOpenAI client
-        self.client = AsyncOpenAI(api_key=self.api_key)
+        Args:
+            key_parts: JSON-serializable request identity (messages, model, ...)
+            call: Zero-argument coroutine function performing the request
+        """
+        key = hashlib.blake2b(
+            orjson.dumps(key_parts, option=orjson.OPT_SORT_KEYS), digest_size=16
+        ).hexdigest()
         
-        self.logger.info(f"LLMClient initialized with model: {self.default_model}")
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.logger.debug("Coalescing duplicate in-flight request %s", key)
+            # shield: a cancelled follower must not cancel the shared request
+            return await asyncio.shield(pending)
+        
+        future = asyncio.get_running_loop().create_future()
+        # Mark the exception retrieved even when no follower awaited it
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+    
+    def _retrying(self) -> AsyncRetrying:
+        """Retry policy shared by _create and _stream.
+        
+        Rate limits (429), connection errors and timeouts, and 5xx responses are
+        retried up to 6 attempts in total with jittered exponential backoff (0.5s
+        base, 8s cap). Other API errors (e.g. 400, 401) are raised at once.
+        """
+        # APIConnectionError also covers APITimeoutError
+        from openai import APIConnectionError, InternalServerError, RateLimitError
+        from tenacity import (
+            AsyncRetrying,
+            before_sleep_log,
+            retry_if_exception_type,
+            stop_after_attempt,
+            wait_random_exponential,
+        )
+        
+        return AsyncRetrying(
+            retry=retry_if_exception_type((RateLimitError, APIConnectionError, InternalServerError)),
+            wait=wait_random_exponential(multiplier=0.5, max=8),
+            stop=stop_after_attempt(6),
+            before_sleep=before_sleep_log(self.logger, logging.WARNING),
+            reraise=True
+        )
     
-    async def prompt(self, messages: List[Dict[str, str]], model: Optional[str] = None) -> str:
+    async def _create(self, **params):
+        """
+        chat.completions.create bounded by the semaphore and retried on transient errors.
+        
+        See _retrying for the policy. The backoff sleeps outside the semaphore, so
+        each attempt queues for a slot again instead of holding one.
+        """
+        async for attempt in self._retrying():
+            with attempt:
+                async with self._semaphore():
+                    return await self.client.chat.completions.create(**params)
+    
+    @asynccontextmanager
+    async def _stream(self, **params) -> AsyncIterator[Any]:
+        """
+        Streaming chat.completions.create, bounded and retried like _create.
+        
+        Only opening the stream is retried; once chunks arrive a failure is raised
+        to the caller. The semaphore slot is held until the stream is closed, so a
+        stream counts against max_concurrency for as long as it runs.
+        """
+        async for attempt in self._retrying():
+            with attempt:
+                sem = self._semaphore()
+                await sem.acquire()
+                try:
+                    stream = await self.client.chat.completions.create(stream=True, **params)
+                except BaseException:
+                    sem.release()
+                    raise
+        try:
+            yield stream
+        finally:
+            sem.release()
+            await stream.close()
+    
+    async def prompt(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        system: Optional[str] = None
+    ) -> str:
         """
         Basic chat completion.
         
         Args:
             messages: List of chat completion objects [{'role': <>, 'content': <>}, ...]
             model: OpenAI model to use (defaults to OPENAI_MODEL from env)
+            system: Name of a system prompt in prompts/ to send first
             
         Returns:
             Completion.choices[0].message.content: String form of completion
         """
         model = model or self.default_model
+        messages = self._with_system(messages, system)
         
         try:
-            self.logger.debug(f"Sending prompt to {model} with {len(messages)} messages")
+            self.logger.debug("Sending prompt to %s with %d messages", model, len(messages))
             
-            completion = await self.client.chat.completions.create(
-                model=model,
-                messages=messages
-            )
+            async def request():
+                completion = await self._create(model=model, messages=messages)
+                return completion.choices[0].message.content
             
-            response = completion.choices[0].message.content
-            self.logger.debug(f"Received response: {response[:100]}...")
+            response = await self._coalesce(["prompt", messages, model], request)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Received response: %s...", response[:100])
             
             return response
             
@@ -77,12 +330,90 @@ class LLMClient:
             self.logger.error(f"Error in prompt: {e}")
             raise
     
+    async def parse_structured_stream(
+        self,
+        messages: List[Dict[str, str]],
+        response_format: Type[BaseModel],
+        item_format: Type[T],
+        prefix: str,
+        model: Optional[str] = None,
+        system: Optional[str] = None
+    ) -> AsyncIterator[T]:
+        """
+        Structured output whose list items are yielded while the response streams.
+        
+        The completion is constrained to response_format, and an incremental ijson
+        parser emits each element found at prefix as soon as it is complete.
+        Streams are not coalesced.
+        
+        Args:
+            messages: List of chat completion objects [{'role': <>, 'content': <>}, ...]
+            response_format: Pydantic model the whole response follows
+            item_format: Pydantic model of the streamed list items
+            prefix: ijson path of the items (e.g. 'activities.item')
+            model: OpenAI model to use (defaults to OPENAI_MODEL from env)
+            system: Name of a system prompt in prompts/ to send first
+            
+        Yields:
+            item_format objects (or their msgspec twins, see parse_structured)
+        """
+        import ijson
+        from .structured import _openai_schema_for, convert_structured
+        
+        model = model or self.default_model
+        messages = self._with_system(messages, system)
+        
+        try:
+            self.logger.debug("Streaming structured prompt to %s", model)
+            
+            items = ijson.sendable_list()
+            parser = ijson.items_coro(items, prefix, use_float=True)
+            async with self._stream(
+                model=model,
+                messages=messages,
+                response_format=_openai_schema_for(response_format)
+            ) as stream:
+                async for chunk in stream:
+                    if not (chunk.choices and chunk.choices[0].delta.content):
+                        continue
+                    parser.send(chunk.choices[0].delta.content.encode())
+                    for item in items:
+                        yield convert_structured(item_format, item)
+                    del items[:]
+            
+            parser.close()
+            for item in items:
+                yield convert_structured(item_format, item)
+                
+        except Exception as e:
+            self.logger.error(f"Error in parse_structured_stream: {e}")
+            raise
+    
+    def register_toolkit(self, name: str, tools: List[Dict[str, Any]]) -> str:
+        """
+        Register a toolkit once for repeated use with prompt_with_tools_named.
+        
+        The tools are serialized and hashed here rather than on every call
+        (the hash identifies the toolkit when coalescing duplicate requests).
+        
+        Args:
+            name: Handle to refer to the toolkit by
+            tools: List of tool functions available to agent (from openai tool config)
+            
+        Returns:
+            The handle to pass as toolkit_name
+        """
+        blob = orjson.dumps(tools, option=orjson.OPT_SORT_KEYS)
+        self._toolkits[name] = (list(tools), hashlib.blake2b(blob, digest_size=16).hexdigest())
+        return name
+    
     async def prompt_with_tools(
         self, 
         messages: List[Dict[str, str]], 
         tools: List[Dict[str, Any]],
-        model: Optional[str] = None
-    ) -> List[Dict[str, Any]]:
+        model: Optional[str] = None,
+        system: Optional[str] = None
+    ) -> List[ToolCallStruct]:
         """
         Tool-calling functionality.
         
@@ -90,85 +421,145 @@ class LLMClient:
             messages: List of chat completion objects [{'role': <>, 'content': <>}, ...]
             tools: List of tool functions available to agent (from openai tool config)
             model: OpenAI model to use (defaults to OPENAI_MODEL from env)
+            system: Name of a system prompt in prompts/ to send first
             
         Returns:
-            Completion.choices[0].message.tool_calls
+            Completion.choices[0].message.tool_calls as ToolCallStructs
+            (call.id, call.type, call.function.name, call.function.arguments)
         """
         model = model or self.default_model
+        messages = self._with_system(messages, system)
         
         try:
-            self.logger.debug(f"Sending prompt with tools to {model}")
-            self.logger.debug(f"Tools available: {[tool.get('function', {}).get('name', 'Unknown') for tool in tools]}")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Sending prompt with tools to %s", model)
+                self.logger.debug(
+                    "Tools available: %s", [tool.get('function', {}).get('name', 'Unknown') for tool in tools]
+                )
             
-            completion = await self.client.chat.completions.create(
-                model=model,
-                messages=messages,
-                tools=tools,
-                tool_choice="auto"  # Let the model decide which tool to use
+            return await self._coalesce(
+                ["prompt_with_tools", messages, tools, model],
+                partial(self._request_tool_calls, messages, tools, model)
             )
-            
-            tool_calls = completion.choices[0].message.tool_calls
-            
-            if tool_calls:
-                self.logger.debug(f"Model requested {len(tool_calls)} tool calls")
-                return [
-                    {
-                        "id": call.id,
-                        "type": call.type,
-                        "function": {
-                            "name": call.function.name,
-                            "arguments": call.function.arguments
-                        }
-                    }
-                    for call in tool_calls
-                ]
-            else:
-                self.logger.debug("No tool calls requested by model")
-                return []
                 
         except Exception as e:
             self.logger.error(f"Error in prompt_with_tools: {e}")
             raise
     
+    async def prompt_with_tools_named(
+        self,
+        messages: List[Dict[str, str]],
+        toolkit_name: str,
+        model: Optional[str] = None,
+        system: Optional[str] = None
+    ) -> List[ToolCallStruct]:
+        """
+        Tool-calling with a toolkit registered through register_toolkit.
+        
+        Args:
+            messages: List of chat completion objects [{'role': <>, 'content': <>}, ...]
+            toolkit_name: Handle returned by register_toolkit
+            model: OpenAI model to use (defaults to OPENAI_MODEL from env)
+            system: Name of a system prompt in prompts/ to send first
+            
+        Returns:
+            Same as prompt_with_tools
+            
+        Raises:
+            KeyError: If no toolkit is registered under toolkit_name
+        """
+        model = model or self.default_model
+        messages = self._with_system(messages, system)
+        
+        try:
+            tools, digest = self._toolkits[toolkit_name]
+            self.logger.debug("Sending prompt with toolkit '%s' to %s", toolkit_name, model)
+            
+            return await self._coalesce(
+                ["prompt_with_tools", messages, digest, model],
+                partial(self._request_tool_calls, messages, tools, model)
+            )
+                
+        except Exception as e:
+            self.logger.error(f"Error in prompt_with_tools_named: {e}")
+            raise
+    
+    async def _request_tool_calls(
+        self,
+        messages: List[Dict[str, str]],
+        tools: List[Dict[str, Any]],
+        model: str
+    ) -> List[ToolCallStruct]:
+        """Send one tool-calling completion and return the requested calls."""
+        import msgspec
+        from .structured import ToolCallStruct
+        
+        completion = await self._create(
+            model=model,
+            messages=messages,
+            tools=tools,
+            tool_choice="auto"  # Let the model decide which tool to use
+        )
+        
+        tool_calls = completion.choices[0].message.tool_calls
+        
+        if tool_calls:
+            self.logger.debug("Model requested %d tool calls", len(tool_calls))
+            return msgspec.convert(tool_calls, type=List[ToolCallStruct], from_attributes=True)
+        else:
+            self.logger.debug("No tool calls requested by model")
+            return []
+    
     async def parse_structured(
         self,
         messages: List[Dict[str, str]],
         response_format: Type[T],
-        model: Optional[str] = None
+        model: Optional[str] = None,
+        system: Optional[str] = None
     ) -> T:
         """
         Structured output parsing using Pydantic.
         
+        The response format's JSON schema is built once per type (see
+        _openai_schema_for) and the completion is decoded locally.
+        
         Args:
             messages: List of chat completion objects [{'role': <>, 'content': <>}, ...]
             response_format: Pydantic model type for parsing
             model: OpenAI model to use (defaults to OPENAI_MODEL from env)
+            system: Name of a system prompt in prompts/ to send first
             
         Returns:
-            completion.choices[0].message.parsed: Parsed Pydantic object
+            Parsed Pydantic object, or an instance of its msgspec twin (same
+            fields) if one is registered in _MSGSPEC_MAP
         """
+        from .structured import _openai_schema_for, decode_structured
+        
         model = model or self.default_model
+        messages = self._with_system(messages, system)
         
         try:
-            self.logger.debug(f"Sending structured prompt to {model}")
-            self.logger.debug(f"Expected response format: {response_format.__name__}")
-            
-            completion = await self.client.beta.chat.completions.parse(
-                model=model,
-                messages=messages,
-                response_format=response_format
-            )
-            
-            parsed_response = completion.choices[0].message.parsed
+            self.logger.debug("Sending structured prompt to %s", model)
+            self.logger.debug("Expected response format: %s", response_format.__name__)
             
-            if parsed_response:
-                self.logger.debug(f"Successfully parsed response as {response_format.__name__}")
+            async def request():
+                completion = await self._create(
+                    model=model,
+                    messages=messages,
+                    response_format=_openai_schema_for(response_format)
+                )
+                
+                message = completion.choices[0].message
+                if not message.content:
+                    raise ValueError(
+                        f"No {response_format.__name__} in response: {getattr(message, 'refusal', None) or 'empty content'}"
+                    )
+                parsed_response = decode_structured(response_format, message.content)
+                self.logger.debug("Successfully parsed response as %s", response_format.__name__)
                 return parsed_response
-            else:
-                # Fallback to manual parsing if structured output fails
-                self.logger.warning("Structured output parsing failed, attempting manual parsing")
-                content = completion.choices[0].message.content
-                return response_format.model_validate_json(content)
+            
+            format_name = f"{response_format.__module__}.{response_format.__qualname__}"
+            return await self._coalesce(["parse_structured", messages, format_name, model], request)
                 
         except Exception as e:
             self.logger.error(f"Error in parse_structured: {e}")
@@ -0,0 +1,101 @@
+"""
+Structured output decoding for autoscheduler2 LLM calls.
+
+Maps Pydantic response formats to msgspec Struct twins so hot structured
+outputs are decoded by msgspec instead of validated through Pydantic.
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, Type
+import msgspec
+import orjson
+from openai.lib._parsing._completions import type_to_response_format_param
+from pydantic import BaseModel
+
+from ..models import (
+    ActivityBatch,
+    ActivityBatchStruct,
+    ActivityDraft,
+    ActivityDraftStruct,
+    ActivitySchema,
+    ActivityStruct,
+    RelationshipSchema,
+    RelationshipStruct,
+)
+
+# Pydantic response formats with a msgspec twin; parse_structured decodes these
+# with msgspec instead of validating through Pydantic
+_MSGSPEC_MAP: Dict[Type[BaseModel], Type[msgspec.Struct]] = {
+    ActivitySchema: ActivityStruct,
+    ActivityDraft: ActivityDraftStruct,
+    ActivityBatch: ActivityBatchStruct,
+    RelationshipSchema: RelationshipStruct,
+}
+
+# One reusable decoder per twin
+_DECODERS = {model: msgspec.json.Decoder(struct) for model, struct in _MSGSPEC_MAP.items()}
+
+
+class ToolFunctionStruct(msgspec.Struct):
+    """Function requested by a tool call."""
+    
+    name: str
+    arguments: str  # JSON-encoded arguments, as sent by the model
+    
+    def parsed_arguments(self) -> Dict[str, Any]:
+        """Decode the arguments with orjson (empty dict if the model sent none)."""
+        return orjson.loads(self.arguments) if self.arguments else {}
+
+
+class ToolCallStruct(msgspec.Struct):
+    """A tool call requested by the model."""
+    
+    id: str
+    type: str
+    function: ToolFunctionStruct
+
+
+@lru_cache(maxsize=None)
+def _openai_schema_for(cls: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    OpenAI response_format param for a Pydantic model, built once per type.
+    
+    Uses the SDK's own helper (the strict json_schema that beta.parse sends), so
+    chat.completions.create gets the same schema without per-call introspection.
+    The model is rebuilt first so its pydantic-core validator is complete.
+    """
+    cls.model_rebuild()
+    return type_to_response_format_param(cls)
+
+
+def convert_structured(response_format: Type[BaseModel], obj: Any) -> Any:
+    """
+    Build response_format from already parsed JSON (e.g. items from a streaming parser).
+    
+    Returns:
+        An instance of the msgspec twin if response_format has one, otherwise of response_format
+    """
+    struct = _MSGSPEC_MAP.get(response_format)
+    if struct is not None:
+        return msgspec.convert(obj, struct)
+    return response_format.model_validate(obj)
+
+
+def decode_structured(response_format: Type[BaseModel], content) -> Any:
+    """
+    Decode JSON content as response_format.
+    
+    Returns:
+        An instance of the msgspec twin if response_format has one, otherwise of response_format
+    """
+    decoder = _DECODERS.get(response_format)
+    if decoder is not None:
+        return decoder.decode(content)
+    # pydantic-core parses and validates JSON in one native pass, which beats
+    # orjson.loads followed by model_validate
+    return response_format.model_validate_json(content)
+
+
+# Precompute the schemas of the hot formats at import
+for _model in _MSGSPEC_MAP:
+    _openai_schema_for(_model)
@@ -0,0 +1,366 @@
+"""
+Activity vector index for autoscheduler2.
+
+Stores activity embeddings in a sqlite-vec table next to the activity metadata,
+so scope retrieval runs a local KNN query instead of a ChromaDB round trip.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List, Optional
+import numpy as np
+import orjson
+
+from .embeddings import EMBEDDING_DIM
+
+# Set MEMOS_USE_VEC_INDEX=false to search activities through ChromaDB instead
+VEC_INDEX_ENABLED = os.getenv('MEMOS_USE_VEC_INDEX', 'true').strip().lower() not in ('0', 'false', 'no')
+
+# Set EMBEDDING_QUANTIZE=int8 to store activity embeddings as int8 (4x smaller)
+# instead of float32; switching modes rebuilds the index from ChromaDB
+QUANTIZE_INT8 = os.getenv('EMBEDDING_QUANTIZE', '').strip().lower() == 'int8'
+
+# Weight of the normalized BM25 score in hybrid_search (cosine similarity gets the rest)
+HYBRID_BM25_WEIGHT = 0.4
+
+# Each ranker contributes up to k * HYBRID_POOL_FACTOR candidates to hybrid_search
+HYBRID_POOL_FACTOR = 4
+
+
+def quantize_int8(embedding: np.ndarray) -> np.ndarray:
+    """
+    Symmetric per-vector int8 quantization.
+    
+    The scale (max |v| / 127) is not stored: the index ranks by cosine
+    distance, which is invariant to each vector's scale.
+    """
+    vector = np.asarray(embedding, dtype=np.float32)
+    peak = np.max(np.abs(vector))
+    if peak == 0:
+        return np.zeros(vector.shape, dtype=np.int8)
+    return np.round(vector * (127 / peak)).astype(np.int8)
+
+
+def _fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query matching any of its words.
+    
+    Each word is quoted, so FTS5 operators and punctuation in the prompt
+    (AND, -, quotes, ...) are treated as plain text.
+    """
+    return " OR ".join(f'"{word}"' for word in re.findall(r"\w+", text.lower()))
+
+
+def _min_max(scores: np.ndarray) -> np.ndarray:
+    """Scale scores to [0, 1] (all 1.0 if every score is equal); NaN entries become 0."""
+    present = ~np.isnan(scores)
+    if not present.any():
+        return np.zeros_like(scores)
+    lo, hi = scores[present].min(), scores[present].max()
+    if hi == lo:
+        return np.where(present, 1.0, 0.0)
+    return np.where(present, (scores - lo) / (hi - lo), 0.0)
+
+
+class CandidateBuffer:
+    """
+    Struct-of-arrays batch of search candidates.
+    
+    Row i of emb belongs to rowids[i], ids[i], texts[i] and metadata[i], so a
+    whole batch is scored with one matrix-vector product instead of a Python
+    loop over records, and metadata is only decoded for the rows returned.
+    """
+    
+    __slots__ = ("rowids", "ids", "texts", "metadata", "emb")
+    
+    def __init__(self, rowids: np.ndarray, ids: np.ndarray, texts: List[str],
+                 metadata: List[str], emb: np.ndarray):
+        self.rowids = rowids
+        self.ids = ids
+        self.texts = texts
+        self.metadata = metadata
+        self.emb = emb
+    
+    @classmethod
+    def from_rows(cls, rows: List[tuple], quantized: bool = False) -> 'CandidateBuffer':
+        """
+        Build a buffer from (rowid, activity_id, text, metadata, embedding bytes) rows.
+        
+        Args:
+            rows: Rows as returned by VectorIndex._candidates
+            quantized: Embeddings are int8 (see quantize_int8); they are converted
+                back to L2-normalized float32 so cosine() stays a plain dot product
+        """
+        rowids, ids, texts, metadata, blobs = zip(*rows) if rows else ((), (), (), (), ())
+        # One contiguous (N, EMBEDDING_DIM) float32 copy of all the vectors
+        if quantized:
+            emb = np.frombuffer(b"".join(blobs), dtype=np.int8).reshape(-1, EMBEDDING_DIM).astype(np.float32)
+            norms = np.linalg.norm(emb, axis=1, keepdims=True)
+            emb /= np.where(norms == 0, 1.0, norms)
+        else:
+            emb = np.frombuffer(b"".join(blobs), dtype=np.float32).reshape(-1, EMBEDDING_DIM)
+        return cls(
+            np.array(rowids, dtype=np.int64),
+            np.array(ids, dtype=object),
+            list(texts),
+            list(metadata),
+            emb
+        )
+    
+    def __len__(self) -> int:
+        return len(self.rowids)
+    
+    def cosine(self, query_emb: np.ndarray) -> np.ndarray:
+        """Cosine similarity of every candidate to an L2-normalized query embedding."""
+        return self.emb @ np.asarray(query_emb, dtype=np.float32)
+    
+    def top_k(self, scores: np.ndarray, k: int) -> np.ndarray:
+        """Indices of the k highest scores, best first (argpartition, so only the k winners are sorted)."""
+        k = min(k, len(scores))
+        if k <= 0:
+            return np.empty(0, dtype=np.intp)
+        idx = np.argpartition(-scores, k - 1)[:k]
+        return idx[np.argsort(-scores[idx])]
+    
+    def records(self, idx: np.ndarray) -> List[dict]:
+        """Activity records ({"id": activity_id, **metadata}) for the given rows, in order."""
+        return [{"id": self.ids[i], **orjson.loads(self.metadata[i])} for i in idx]
+
+
+class VectorIndex:
+    """sqlite-vec KNN index of activity embeddings keyed by activity_id."""
+    
+    def __init__(self, path: Optional[str] = None, quantize: Optional[bool] = None, source: str = ""):
+        """
+        Initialize the index; the database is opened on first use.
+        
+        Args:
+            path: SQLite database file (defaults to vector_index-<hash of source>.db
+                in VECTOR_INDEX_DIR from env, then in ~/.cache/autoscheduler2)
+            quantize: Store int8 instead of float32 embeddings (defaults to
+                EMBEDDING_QUANTIZE=int8 from env)
+            source: Identity of the mirrored ChromaDB collection (server or data
+                path plus collection name), so each collection gets its own file
+        """
+        self.logger = logging.getLogger(__name__)
+        if path is None:
+            directory = os.getenv('VECTOR_INDEX_DIR', str(Path.home() / '.cache' / 'autoscheduler2'))
+            digest = hashlib.blake2b(source.encode(), digest_size=8).hexdigest()
+            path = str(Path(directory) / f"vector_index-{digest}.db")
+        self.path = path
+        self.quantize = QUANTIZE_INT8 if quantize is None else quantize
+        # int8 vectors must be tagged with vec_int8(); bare blobs are read as float32
+        self._vec_param = "vec_int8(?)" if self.quantize else "?"
+        self._conn = None
+        self._available = True
+        self._lock = threading.Lock()
+    
+    def _vector(self, embedding: np.ndarray) -> bytes:
+        """Serialize an embedding for the vec_activities column type."""
+        if self.quantize:
+            return quantize_int8(embedding).tobytes()
+        return np.asarray(embedding, dtype=np.float32).tobytes()
+    
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Open the database and create the tables, disabling the index if sqlite-vec is unavailable."""
+        if self._conn is not None or not self._available:
+            return self._conn
+        
+        try:
+            import sqlite_vec
+            
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.enable_load_extension(True)
+            sqlite_vec.load(conn)
+            conn.enable_load_extension(False)
+            if self.quantize:
+                column = f"embedding int8[{EMBEDDING_DIM}] distance_metric=cosine"
+            else:
+                column = f"embedding float[{EMBEDDING_DIM}]"
+            # The index is derived from ChromaDB, so a database built with the other
+            # EMBEDDING_QUANTIZE mode is dropped and backfilled again by the Schedule
+            existing = conn.execute(
+                "SELECT sql FROM sqlite_master WHERE name = 'vec_activities'"
+            ).fetchone()
+            if existing and column not in existing[0]:
+                self.logger.info("Rebuilding vector index for EMBEDDING_QUANTIZE change")
+                for table in ("vec_activities", "fts_activities", "activities"):
+                    conn.execute(f"DROP TABLE IF EXISTS {table}")
+            conn.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS vec_activities USING vec0({column})")
+            # rowid is shared with vec_activities
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS activities ("
+                "rowid INTEGER PRIMARY KEY, activity_id TEXT NOT NULL UNIQUE, "
+                "text TEXT NOT NULL, metadata TEXT NOT NULL)"
+            )
+            # Full-text twin of the activities table (same rowid) for BM25 ranking
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS fts_activities "
+                "USING fts5(activity_id, text, tokenize='porter')"
+            )
+            # Indexes created before fts_activities existed are backfilled once
+            if conn.execute("SELECT count(*) FROM fts_activities").fetchone()[0] == 0:
+                conn.execute(
+                    "INSERT INTO fts_activities (rowid, activity_id, text) "
+                    "SELECT rowid, activity_id, text FROM activities"
+                )
+            conn.commit()
+        except Exception as e:
+            self.logger.warning(f"Vector index disabled: {e}")
+            self._available = False
+            return None
+        
+        self._conn = conn
+        return conn
+    
+    @property
+    def available(self) -> bool:
+        """Whether the index can be used (opens the database; False if sqlite-vec is unavailable)."""
+        with self._lock:
+            return self._connect() is not None
+    
+    def ids(self) -> set:
+        """activity_ids of every indexed activity (empty if the index is unavailable)."""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return set()
+            return {activity_id for (activity_id,) in conn.execute("SELECT activity_id FROM activities")}
+    
+    def count(self) -> int:
+        """Number of indexed activities (0 if the index is unavailable)."""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return 0
+            return conn.execute("SELECT count(*) FROM activities").fetchone()[0]
+    
+    def upsert(self, activity_id: str, embedding: np.ndarray, text: str = "", metadata: Optional[dict] = None):
+        """
+        Insert or replace an activity in both tables.
+        
+        Args:
+            activity_id: UUID of the activity
+            embedding: L2-normalized float32 embedding of the activity document
+                (quantized to int8 here if the index is quantized)
+            text: Embedded activity document
+            metadata: Activity record returned by hybrid_search (defaults to {})
+        """
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            vector = self._vector(embedding)
+            row = conn.execute("SELECT rowid FROM activities WHERE activity_id = ?", (activity_id,)).fetchone()
+            if row:
+                rowid = row[0]
+                conn.execute(
+                    "UPDATE activities SET text = ?, metadata = ? WHERE rowid = ?",
+                    (text, orjson.dumps(metadata or {}).decode(), rowid)
+                )
+                conn.execute("DELETE FROM vec_activities WHERE rowid = ?", (rowid,))
+                conn.execute("DELETE FROM fts_activities WHERE rowid = ?", (rowid,))
+            else:
+                rowid = conn.execute(
+                    "INSERT INTO activities (activity_id, text, metadata) VALUES (?, ?, ?)",
+                    (activity_id, text, orjson.dumps(metadata or {}).decode())
+                ).lastrowid
+            conn.execute(
+                f"INSERT INTO vec_activities (rowid, embedding) VALUES (?, {self._vec_param})",
+                (rowid, vector)
+            )
+            conn.execute(
+                "INSERT INTO fts_activities (rowid, activity_id, text) VALUES (?, ?, ?)",
+                (rowid, activity_id, text)
+            )
+            conn.commit()
+    
+    def delete(self, activity_id: str):
+        """Remove an activity from both tables (no-op if it is not indexed)."""
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            row = conn.execute("SELECT rowid FROM activities WHERE activity_id = ?", (activity_id,)).fetchone()
+            if row:
+                conn.execute("DELETE FROM vec_activities WHERE rowid = ?", row)
+                conn.execute("DELETE FROM fts_activities WHERE rowid = ?", row)
+                conn.execute("DELETE FROM activities WHERE rowid = ?", row)
+                conn.commit()
+    
+    def hybrid_search(self, query_text: str, query_emb: np.ndarray, k: int,
+                      bm25_weight: float = HYBRID_BM25_WEIGHT) -> List[dict]:
+        """
+        Rank activities by a blend of BM25 and cosine similarity.
+        
+        BM25 catches exact terms that embeddings blur (e.g. "floor 4" vs "floor 2",
+        activity id fragments); cosine similarity catches paraphrases.
+        
+        Args:
+            query_text: Free-text query matched against the activity text and id
+            query_emb: L2-normalized float32 embedding of the query
+            k: Number of activities to return
+            bm25_weight: Weight of the BM25 score; cosine similarity gets 1 - bm25_weight
+            
+        Returns:
+            Activity records ({"id": activity_id, **metadata}), best first
+            
+        Function:
+            - Take the top k * HYBRID_POOL_FACTOR candidates of each ranker
+            - Load the pool into a CandidateBuffer in one query and score it with
+              one matrix-vector product
+            - Min-max normalize BM25 scores and cosine similarities over the pool
+              (candidates without a text match score 0 for BM25)
+            - Score = bm25_weight * bm25 + (1 - bm25_weight) * cosine
+        """
+        pool = k * HYBRID_POOL_FACTOR
+        vector = self._vector(query_emb)
+        match = _fts_query(query_text)
+        
+        with self._lock:
+            conn = self._connect()
+            if conn is None:
+                return []
+            candidates = dict.fromkeys(
+                rowid for (rowid,) in conn.execute(
+                    # k = ? rather than LIMIT: vec0 only reads LIMIT as k on SQLite >= 3.41
+                    f"SELECT rowid FROM vec_activities WHERE embedding MATCH {self._vec_param} "
+                    "AND k = ? ORDER BY distance",
+                    (vector, pool)
+                )
+            )
+            # bm25() is lower-is-better, so negate it
+            bm25 = {}
+            if match:
+                bm25 = {
+                    rowid: -score
+                    for rowid, score in conn.execute(
+                        "SELECT rowid, bm25(fts_activities) FROM fts_activities "
+                        "WHERE fts_activities MATCH ? ORDER BY rank LIMIT ?",
+                        (match, pool)
+                    )
+                }
+            candidates.update(dict.fromkeys(bm25))
+            buf = self._candidates(conn, list(candidates))
+        
+        if not len(buf):
+            return []
+        bm25_scores = np.array([bm25.get(rowid, np.nan) for rowid in buf.rowids.tolist()])
+        scores = bm25_weight * _min_max(bm25_scores) + (1 - bm25_weight) * _min_max(buf.cosine(query_emb))
+        return buf.records(buf.top_k(scores, k))
+    
+    def _candidates(self, conn: sqlite3.Connection, rowids: List[int]) -> CandidateBuffer:
+        """Load activities and their embeddings for the given rowids in one query."""
+        if not rowids:
+            return CandidateBuffer.from_rows([], self.quantize)
+        return CandidateBuffer.from_rows(conn.execute(
+            "SELECT a.rowid, a.activity_id, a.text, a.metadata, v.embedding "
+            "FROM activities a JOIN vec_activities v ON v.rowid = a.rowid "
+            f"WHERE a.rowid IN ({','.join('?' * len(rowids))})",
+            rowids
+        ).fetchall(), self.quantize)
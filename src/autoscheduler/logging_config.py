@@ -0,0 +1,29 @@
+"""
+Logging configuration for autoscheduler2.
+
+Modules only call logging.getLogger(__name__); handlers and levels are set up
+once at startup by configure().
+"""
+
+import logging
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+def configure(level: int = logging.INFO):
+    """
+    Attach a console handler to the autoscheduler logger hierarchy.
+    
+    Only the package's loggers are configured (not the root logger), so
+    third-party libraries such as httpx keep their own, quieter defaults.
+    Calling configure() again only updates the level.
+    
+    Args:
+        level: Minimum level emitted by autoscheduler loggers
+    """
+    logger = logging.getLogger('autoscheduler')
+    logger.setLevel(level)
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        logger.addHandler(handler)
@@ -0,0 +1,30 @@
+"""
+Models module for autoscheduler2.
+
+Provides the activity and relationship schemas shared by the schedule,
+scope manager and LLM client.
+"""
+
+from .schemas import (
+    ActivityBatch,
+    ActivityBatchStruct,
+    ActivityDraft,
+    ActivityDraftStruct,
+    ActivitySchema,
+    ActivityStruct,
+    RelationshipSchema,
+    RelationshipStruct,
+    RelationshipType,
+)
+
+__all__ = [
+    'ActivityBatch',
+    'ActivityBatchStruct',
+    'ActivityDraft',
+    'ActivityDraftStruct',
+    'ActivitySchema',
+    'ActivityStruct',
+    'RelationshipSchema',
+    'RelationshipStruct',
+    'RelationshipType',
+]
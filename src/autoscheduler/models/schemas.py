@@ -0,0 +1,88 @@
+"""
+Domain schemas for autoscheduler2.
+
+Pydantic models for activities and relationships, plus msgspec Struct twins
+with the same fields used as the fast decode path for LLM structured output.
+Keep each twin in sync with its Pydantic model.
+"""
+
+from enum import Enum
+from typing import List
+from uuid import UUID, uuid4
+import msgspec
+from pydantic import BaseModel, Field
+
+
+class RelationshipType(str, Enum):
+    """Supported relationship types in project scheduling."""
+    
+    FS = "FS"  # Finish-to-Start
+    SS = "SS"  # Start-to-Start
+    FF = "FF"  # Finish-to-Finish
+    SF = "SF"  # Start-to-Finish
+
+
+class ActivitySchema(BaseModel):
+    """A high-level schedule activity."""
+    
+    activity_id: UUID = Field(default_factory=uuid4)
+    name: str
+    description: str
+    duration: int = Field(description="Duration in days")
+
+
+class ActivityDraft(BaseModel):
+    """An activity as generated by the LLM; its id is assigned locally."""
+    
+    name: str
+    description: str
+    duration: int = Field(description="Duration in days")
+
+
+class RelationshipSchema(BaseModel):
+    """A dependency between a predecessor and a successor activity."""
+    
+    id: UUID = Field(default_factory=uuid4)
+    type: RelationshipType
+    predecessor: ActivitySchema
+    successor: ActivitySchema
+    lag: int = Field(default=0, description="Lag time in days")
+
+
+class ActivityBatch(BaseModel):
+    """Activities generated together by one structured LLM call."""
+    
+    activities: List[ActivityDraft]
+
+
+class ActivityStruct(msgspec.Struct, kw_only=True):
+    """msgspec twin of ActivitySchema."""
+    
+    activity_id: UUID = msgspec.field(default_factory=uuid4)
+    name: str
+    description: str
+    duration: int
+
+
+class ActivityDraftStruct(msgspec.Struct, kw_only=True):
+    """msgspec twin of ActivityDraft."""
+    
+    name: str
+    description: str
+    duration: int
+
+
+class RelationshipStruct(msgspec.Struct, kw_only=True):
+    """msgspec twin of RelationshipSchema."""
+    
+    id: UUID = msgspec.field(default_factory=uuid4)
+    type: RelationshipType
+    predecessor: ActivityStruct
+    successor: ActivityStruct
+    lag: int = 0
+
+
+class ActivityBatchStruct(msgspec.Struct):
+    """msgspec twin of ActivityBatch."""
+    
+    activities: List[ActivityDraftStruct]